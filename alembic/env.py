@@ -11,6 +11,7 @@ from app.core.database import Base
 # Import all models so Alembic can detect them
 from app.models.task import Task
 from app.models.user import User
+from app.models.speech_job import SpeechJob
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,32 @@
+"""Add composite index for task listing filters
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /tasks 的 status / type / deadline 篩選
+    op.create_index(
+        'ix_tasks_status_type_deadline',
+        'tasks',
+        ['status', 'type', 'deadline'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_status_type_deadline', table_name='tasks')
@@ -0,0 +1,54 @@
+"""Add speech_jobs table for background speech processing
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'speech_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='speechjobstatus'), nullable=False),
+        sa.Column('stage', sa.String(), nullable=True),
+        sa.Column('audio_path', sa.String(), nullable=True),
+        sa.Column('audio_sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('mime_type', sa.String(), nullable=False),
+        sa.Column('transcript', sa.Text(), nullable=True),
+        sa.Column('task_ids', sa.JSON(), nullable=True),
+        sa.Column('timings', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('error_status', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # 啟動時撈出未完成的 job
+    op.create_index(
+        'ix_speech_jobs_status_created_at',
+        'speech_jobs',
+        ['status', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_speech_jobs_status_created_at', table_name='speech_jobs')
+    op.drop_table('speech_jobs')
+    # PostgreSQL 的 enum type 不會隨 table 一起刪除
+    sa.Enum(name='speechjobstatus').drop(op.get_bind(), checkfirst=True)
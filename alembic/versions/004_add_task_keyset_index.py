@@ -0,0 +1,32 @@
+"""Add index serving keyset pagination under status / type filters
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /tasks?status=&type=&cursor= 依 id 排序：等值篩選後直接照索引順序讀，不需要額外排序
+    op.create_index(
+        'ix_tasks_status_type_id',
+        'tasks',
+        ['status', 'type', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_status_type_id', table_name='tasks')
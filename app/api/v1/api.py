@@ -1,6 +1,6 @@
 # app/api/v1/api.py
 from fastapi import APIRouter
-from app.api.v1.endpoints import tasks, dashboard
+from app.api.v1.endpoints import tasks, dashboard, events, profiling
 
 api_router = APIRouter()
 
@@ -22,4 +22,6 @@ def health_check():
 # tags=["tasks"] 會在 Swagger UI 上建立分類標籤
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(profiling.router, prefix="/profiling", tags=["profiling"], include_in_schema=False)
 # api_router.include_router(user.router, prefix="/users", tags=["users"])
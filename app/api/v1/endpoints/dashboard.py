@@ -1,17 +1,26 @@
 # app/api/v1/endpoints/dashboard.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_db
 from app.services.game_service import game_service
+from app.services.response_cache import response_cache
 from app.schemas.dashboard import DashboardResponse
 
 router = APIRouter()
 
 
 @router.get("/", response_model=DashboardResponse)
-def get_dashboard_status(db: Session = Depends(get_db)):
+async def get_dashboard_status(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     獲取當前的戰略狀態 (HP, XP Multiplier, User Stats)
+    資料沒異動時回傳快取 (最多 DASHBOARD_MAX_STALENESS_SEC 秒，days_left / blackhole_days 隨時間變化)
     """
-    # 這裡預設 user_id = 1 (單機版)
-    return game_service.calculate_state(db, user_id=1)
+    async def render() -> tuple[bytes, dict[str, str]]:
+        # 這裡預設 user_id = 1 (單機版)
+        state = await game_service.calculate_state(db, user_id=1)
+        return DashboardResponse.model_validate(state).model_dump_json().encode(), {}
+
+    return await response_cache.respond(
+        request, "dashboard:1", render, max_age_sec=settings.DASHBOARD_MAX_STALENESS_SEC
+    )
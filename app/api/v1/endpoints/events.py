@@ -0,0 +1,21 @@
+# app/api/v1/endpoints/events.py
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.services.event_bus import event_bus
+from app.utils.sse import SSE_HEADERS
+
+router = APIRouter()
+
+
+@router.get("/")
+async def stream_events():
+    """
+    即時推播 (SSE，取代輪詢 GET /dashboard 與 GET /tasks)：
+    - snapshot: {"dashboard": {...}}  連線後第一個事件，完整的 DashboardResponse
+    - tasks: {"changed": [TaskResponse...], "deleted": [id...]}
+    - dashboard: 與上一次相比有變動的欄位 (套用到 snapshot 上)
+    - resync: {"dashboard": {...}}  client 讀太慢、事件被丟棄時送出，收到後重新抓 GET /tasks
+    變動會合併，最多每 EVENTS_MIN_INTERVAL_SEC 秒送一批；連上後再抓一次 GET /tasks 作為任務列表的起點
+    """
+    return StreamingResponse(event_bus.stream(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,53 @@
+# app/api/v1/endpoints/profiling.py
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.core.config import settings
+from app.core.profiling import (
+    PROFILE_HEADER,
+    list_profiles,
+    summarize_profile,
+    verify_profile_signature,
+)
+
+router = APIRouter()
+
+
+def require_profiling_access(request: Request) -> None:
+    """
+    一律需要 PROFILING_SECRET 與這個請求的 X-Profile 簽章 (profile 內含請求路徑與原始碼路徑)
+    沒設定 secret 時整組路由當作不存在 (只開 PROFILING_ENABLED 時請直接讀 PROFILING_DIR)
+    """
+    if not settings.PROFILING_SECRET:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not verify_profile_signature(
+        request.headers.get(PROFILE_HEADER), request.method, request.url.path
+    ):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Profile signature")
+
+
+# 列出已保存的 profile (最新的在前)
+# GET /api/v1/profiling/
+
+
+@router.get("/", dependencies=[Depends(require_profiling_access)])
+async def read_profiles():
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+
+# 單一 profile 的前 N 個函式 (預設依 cumulative 排序)
+# GET /api/v1/profiling/{profile_id}?limit=30&sort=cumulative
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_access)])
+async def read_profile_summary(
+    profile_id: str,
+    limit: int = Query(30, ge=1, le=500),
+    sort: Literal["cumulative", "tottime"] = "cumulative"
+):
+    summary = await asyncio.to_thread(summarize_profile, profile_id, limit, sort)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
@@ -1,53 +1,116 @@
-from datetime import datetime, timezone
+import json
+import logging
+from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import WriteSessionLocal, get_async_db, get_write_db
+from app.models.speech_job import SpeechJob
 from app.models.task import Task, TaskStatus, TaskType
-from app.models.user import User
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+from app.schemas.speech_job import SpeechJobResponse
+from app.schemas.task import TaskBulkCreate, TaskCreate, TaskResponse, TaskUpdate
 from app.services import task_service
 from app.services.ai_service import ai_service
+from app.services.event_bus import event_bus
 from app.services.game_service import game_service
+from app.services.response_cache import data_version, response_cache
+from app.services.speech_job_service import speech_job_manager
+from app.services.stress_service import stress_aggregate
+from app.services.transcript_policy import speech_counters
+from app.utils.datetime_utils import normalize_deadline_input
+from app.utils.sse import SSE_HEADERS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+TASK_LIST_ADAPTER = TypeAdapter(list[TaskResponse])
+# 單頁上限 (整頁會放進 response cache)
+MAX_PAGE_SIZE = 500
+
 
 # 1. 取得列表 (GET /tasks)
 
 
 @router.get("/", response_model=List[TaskResponse])
-def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def read_tasks(
+    request: Request,
+    task_status: TaskStatus | None = Query(default=None, alias="status"),
+    task_type: TaskType | None = Query(default=None, alias="type"),
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+    cursor: int | None = Query(default=None, description="上一頁回傳的 X-Next-Cursor (keyset 分頁)"),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # 這裡未來可以加 filter，例如 ?status=staged
-    return db.query(Task).offset(skip).limit(limit).all()
+    """
+    篩選：?status=staged&type=school&deadline_from=...&deadline_to=...
+    分頁：建議用 cursor (keyset)，深頁不會像 skip (OFFSET) 一樣變慢
+    任務沒有異動時直接回傳快取 (帶 ETag，If-None-Match 相符回 304)
+    """
+    if cursor is not None and skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+
+    async def render() -> tuple[bytes, dict[str, str]]:
+        tasks = await task_service.list_tasks(
+            db,
+            status=task_status,
+            task_type=task_type,
+            # 無時區的時間視為 settings.TZ，統一轉成 UTC 比較
+            deadline_from=normalize_deadline_input(deadline_from),
+            deadline_to=normalize_deadline_input(deadline_to),
+            after_id=cursor,
+            skip=skip,
+            limit=limit
+        )
+        headers = {}
+        # 還有下一頁時，回傳下一頁的 cursor
+        if len(tasks) == limit:
+            headers["X-Next-Cursor"] = str(tasks[-1].id)
+        body = TASK_LIST_ADAPTER.dump_json(TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True))
+        return body, headers
+
+    key = f"tasks?{sorted(request.query_params.multi_items())}"
+    return await response_cache.respond(request, key, render)
 
 # 2. 建立任務 (POST /tasks) - 注意狀態碼是 201
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     task_in: TaskCreate
 ):
-    return task_service.create_new_task(db=db, task_in=task_in)
+    return await task_service.create_new_task(db=db, task_in=task_in)
+
+# 2-1. 批次建立任務 (POST /tasks/bulk) - 單一 transaction
+
+
+@router.post("/bulk", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+    *,
+    db: AsyncSession = Depends(get_write_db),
+    bulk_in: TaskBulkCreate
+):
+    return await task_service.create_tasks_bulk(db=db, tasks_in=bulk_in.tasks)
 
 # 3. 取得單一任務 (GET /tasks/{task_id})
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def read_task(
+async def read_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task:
         # RESTful 精神：找不到就回 404，不要回 200 然後內容寫 "not found"
         raise HTTPException(status_code=404, detail="Task not found")
@@ -60,40 +123,31 @@ def read_task(
 # app/api/v1/endpoints/tasks.py
 
 @router.patch("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
     task_in: TaskUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Pydantic v2 的 update 寫法
-    update_data = task_in.model_dump(exclude_unset=True)  # 只取有傳的欄位
-    for field, value in update_data.items():
-        setattr(task, field, value)
-
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    return task
+    return await task_service.update_task(db=db, task=task, task_in=task_in)
 
 # 5. 刪除任務 (DELETE /tasks/{task_id})
 # 成功刪除通常不需要回傳資料，所以用 204
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
+    await task_service.delete_task(db=db, task=task)
     return None
 
 # 🆕 新增：AI 語音指令入口
@@ -103,26 +157,133 @@ def delete_task(
 class SpeechTasksResponse(BaseModel):
     transcript: str
     tasks: List[TaskResponse]
+    timings: dict[str, float] = {}
 
 
 @router.post("/speech", response_model=SpeechTasksResponse, status_code=status.HTTP_201_CREATED)
 async def create_tasks_from_speech(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     【Gemini 原生版】接收語音檔 -> Gemini 直接聽並回傳 JSON -> 批次建立任務
     """
     # 1. 呼叫 AI Service (直接處理音訊)
-    tasks_data, transcript = await ai_service.process_audio_instruction(file)
+    tasks_data, transcript, timings = await ai_service.process_audio_instruction(file)
+
+    # 2. 寫入資料庫 (批次，一次 round trip)
+    created_tasks = await task_service.create_tasks_bulk(db=db, tasks_in=tasks_data)
+
+    return {"transcript": transcript, "tasks": created_tasks, "timings": timings}
+
+
+# 語音流程統計 (逐字稿校正略過 / 部分 / 整段 的次數與送出的音訊秒數)
+
+
+@router.get("/speech/stats")
+async def read_speech_stats():
+    return {"counters": speech_counters.snapshot()}
+
+
+# 🆕 串流模式：Gemini 每組好一個任務就寫入並送出 (NDJSON，一行一個事件)
+# POST /api/v1/tasks/speech/stream
+
+
+@router.post("/speech/stream")
+async def stream_tasks_from_speech(
+    file: UploadFile = File(...)
+):
+    """
+    回應為 application/x-ndjson，每行一個 JSON：
+    - {"event": "transcript", "transcript": "..."}
+    - {"event": "task", "task": {...}}      (已寫入資料庫，可直接放進 staging 區)
+    - {"event": "done", "count": 3, "timings": {...}}
+    - {"event": "error", "status": 502, "detail": "..."}  (串流途中失敗，非預期錯誤為 500；已送出的任務保留)
+    轉錄前的錯誤 (檔案太大、太短、Groq 失敗) 仍以一般 HTTP 錯誤回傳
+    """
+    events = ai_service.stream_audio_instruction(file)
+    # 先跑到 transcript，讓前段錯誤維持正常的狀態碼
+    _, transcript = await anext(events)
+
+    async def ndjson():
+        yield _ndjson_line({"event": "transcript", "transcript": transcript})
+        count = 0
+        try:
+            async for kind, payload in events:
+                if kind == "task":
+                    # 每個任務用自己的短 session，等待 Gemini 期間不佔住寫入連線
+                    async with WriteSessionLocal() as db:
+                        task = await task_service.create_new_task(db=db, task_in=payload)
+                    count += 1
+                    yield _ndjson_line({
+                        "event": "task",
+                        "task": TaskResponse.model_validate(task).model_dump(mode="json")
+                    })
+                elif kind == "timings":
+                    yield _ndjson_line({"event": "done", "count": count, "timings": payload})
+        except HTTPException as e:
+            yield _ndjson_line({"event": "error", "status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            # 其他錯誤 (例如寫入資料庫失敗) 也要送出結束行，不要讓串流直接斷掉
+            logger.exception("❌ Speech stream failed after %d tasks", count)
+            yield _ndjson_line({"event": "error", "status": 500, "detail": f"Internal error: {type(e).__name__}"})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson", headers=SSE_HEADERS)
+
+
+def _ndjson_line(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+# 🆕 背景模式：立即回傳 job id，結果用輪詢或 SSE 取得
+# POST /api/v1/tasks/speech/jobs
+
+
+@router.post("/speech/jobs", response_model=SpeechJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_speech_job(
+    response: Response,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    音檔落地後排入背景佇列，不用等 Groq + Gemini 跑完
+    - 輪詢：GET /tasks/speech/jobs/{id}
+    - 推播：GET /tasks/speech/jobs/{id}/events (SSE，每完成一個階段推一次)
+    """
+    job = await speech_job_manager.submit(db, file)
+    response.headers["Location"] = f"{settings.API_V1_STR}/tasks/speech/jobs/{job.id}"
+    return await speech_job_manager.to_response(db, job)
 
-    # 2. 寫入資料庫
-    created_tasks = []
-    for task_in in tasks_data:
-        new_task = task_service.create_new_task(db=db, task_in=task_in)
-        created_tasks.append(new_task)
 
-    return {"transcript": transcript, "tasks": created_tasks}
+@router.get("/speech/jobs/{job_id}", response_model=SpeechJobResponse)
+async def read_speech_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    job = await db.get(SpeechJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Speech job not found")
+    return await speech_job_manager.to_response(db, job)
+
+
+@router.get("/speech/jobs/{job_id}/events")
+async def stream_speech_job_events(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    SSE 事件：status (目前狀態) -> running -> stage (每個階段) -> succeeded / failed (同 GET 的內容)
+    """
+    job = await db.get(SpeechJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Speech job not found")
+    return StreamingResponse(
+        speech_job_manager.stream_events(job_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
 
 
 class CommitResponse(BaseModel):
@@ -134,81 +295,67 @@ class CommitResponse(BaseModel):
 
 
 @router.post("/{task_id}/commit", response_model=CommitResponse)
-def commit_task(
+async def commit_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     【結算儀式】完成任務並計算獎勵
     - School: 釋放壓力 (HP 回升), 黑洞 +0.5 天
     - Skill: 獲得 XP (Base * Multiplier), 黑洞 +3.0 天
+    同一個交易內：條件式 UPDATE 標記完成 + 相對 UPDATE 發放獎勵，重複點擊只會結算一次
     """
-    # 1. 找任務
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if task.status == TaskStatus.COMPLETED:
+    # 1. 取得當下的狀態倍率 (在按下按鈕的那一刻結算，任務仍計入壓力)
+    multiplier = await game_service.current_multiplier(db)
+
+    # 2. 標記完成 (只有尚未完成的任務會被更新)
+    task = await task_service.mark_completed(db, task_id)
+    if task is None:
+        exists = await db.scalar(select(Task.id).where(Task.id == task_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Task not found")
         raise HTTPException(status_code=400, detail="Task already completed")
 
-    # 2. 獲取 User
-    user = db.query(User).filter(User.id == 1).first()  # 單機版預設 ID 1
-
-    if not user:
-        user = User(id=1, username="Commander", level=1.0, current_xp=0, blackhole_days=7.0)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-
-    # 3. 取得當下的狀態倍率 (在按下按鈕的那一刻結算)
-    # 我們只需要 multiplier，所以呼叫 game_service
-    state = game_service.calculate_state(db, user_id=1)
-    multiplier = state["multiplier"]
-
     response_data = {
-        "task_id": task.id,
+        "task_id": task_id,
         "status": "completed",
         "xp_gained": 0,
         "hp_restored": False,
         "message": ""
     }
 
-    # 4. 分歧判斷
+    # 3. 分歧判斷
     if task.type == TaskType.SCHOOL:
         # === SCHOOL (維運) ===
         # 獎勵：黑洞 +0.5 天
-        user.blackhole_days += 0.5
+        xp_gained, blackhole_bonus = 0, 0.5
         response_data["hp_restored"] = True
         response_data["message"] = "Integrity Restored. Blackhole delayed by 12 hours."
 
     elif task.type == TaskType.SKILL:
         # === SKILL (進化) ===
-        # 獎勵：XP * 倍率
-        final_xp = int(task.xp_value * multiplier)
-        user.current_xp += final_xp
-
-        # 獎勵：黑洞 +3.0 天
-        user.blackhole_days += 3.0
-
-        # 升級邏輯 (簡單版：XP 累積到一定程度升級，這裡先不實作複雜公式)
-        # 假設每 1000 XP 升一級
-        user.level = 1.0 + (user.current_xp / 1000.0)
-
-        response_data["xp_gained"] = final_xp
-        response_data["message"] = f"Evolution Complete! +{final_xp} XP ({multiplier}x Efficiency). Blackhole delayed by 3 days."
+        # 獎勵：XP * 倍率，黑洞 +3.0 天 (每 1000 XP 升一級)
+        xp_gained, blackhole_bonus = int(task.xp_value * multiplier), 3.0
+        response_data["message"] = f"Evolution Complete! +{xp_gained} XP ({multiplier}x Efficiency). Blackhole delayed by 3 days."
 
     else:
         # === MISC ===
-        user.blackhole_days += 0.1  # 微量獎勵
-        response_data["xp_gained"] = 10
-        user.current_xp += 10
+        xp_gained, blackhole_bonus = 10, 0.1  # 微量獎勵
         response_data["message"] = "Task done."
 
-    # 5. 標記完成並存檔
-    task.status = TaskStatus.COMPLETED
-    # 更新 User 的最後登入時間/活躍時間
-    user.last_login = datetime.now(timezone.utc)
-
-    db.commit()
+    response_data["xp_gained"] = xp_gained
+
+    # 4. 發放獎勵 (單機版預設 User ID 1，同時更新最後活躍時間) 並一起 commit
+    await game_service.grant_rewards(
+        db,
+        user_id=1,
+        xp=xp_gained,
+        blackhole_days=blackhole_bonus,
+        update_level=task.type == TaskType.SKILL
+    )
+    await db.commit()
+    stress_aggregate.discard(task_id)
+    data_version.bump()
+    event_bus.publish_task(task)
 
     return response_data
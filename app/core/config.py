@@ -1,4 +1,6 @@
 # app/core/config.py
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,14 +12,126 @@ class Settings(BaseSettings):
         default="sqlite:///./entropy.db",
         description="Database connection URL. Use sqlite:////app/data/entropy.db in Docker"
     )
+    ASYNC_DATABASE_URL: str | None = Field(
+        default=None,
+        description="Async driver URL (sqlite+aiosqlite / postgresql+asyncpg). Derived from DATABASE_URL when unset"
+    )
+    # SQLite 專用 (每條連線建立時套用)
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = Field(
+        default="WAL",
+        description="WAL lets reads run alongside the writer; use DELETE on network filesystems"
+    )
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, description="Wait this long for a lock before 'database is locked'")
+    SQLITE_CACHE_SIZE_KIB: int = Field(default=32768, description="Page cache per connection")
+    SQLITE_MMAP_SIZE_BYTES: int = Field(default=256 * 1024 * 1024, description="Memory-mapped I/O size; 0 disables")
 
     # AI Service API Keys
     GROQ_API_KEY: str
     GEMINI_API_KEY: str
+    GROQ_API_BASE_URL: str = "https://api.groq.com"
+    GEMINI_API_BASE_URL: str | None = Field(
+        default=None,
+        description="Override the Gemini endpoint (e.g. the benchmarks stub server)"
+    )
+    GROQ_HTTP2: bool = Field(default=True, description="Use HTTP/2 for Groq when the server supports it")
+    GROQ_MAX_CONCURRENCY: int = Field(default=8, description="Max concurrent Groq uploads / pooled connections")
     GEMINI_MODEL: str = Field(
         default="gemini-3-flash-preview",
         description="Gemini model version for multimodal task parsing"
     )
+    # Gemini 逐字稿校正策略：auto 依 Whisper 信心略過 / 只校正低信心片段；always / never 強制
+    TRANSCRIPT_CORRECTION_MODE: Literal["auto", "always", "never"] = "auto"
+    CORRECTION_MIN_AVG_LOGPROB: float = Field(
+        default=-0.35,
+        description="Segments with a lower Whisper avg_logprob are sent to Gemini for correction"
+    )
+    CORRECTION_MAX_NO_SPEECH_PROB: float = Field(
+        default=0.5,
+        description="Segments with text but a higher no_speech_prob are treated as low confidence"
+    )
+    GEMINI_EXTRACT_BUDGET_SEC: float = Field(
+        default=120.0,
+        description="Overall time budget for task extraction including retries and repairs"
+    )
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Upload the static task prompt once as a Gemini cached content; falls back to inline when unsupported"
+    )
+    GEMINI_CONTEXT_CACHE_TTL_SEC: int = 3600
+
+    # Speech upload ingestion
+    MAX_AUDIO_UPLOAD_BYTES: int = Field(default=50 * 1024 * 1024, description="Reject larger uploads with 413")
+    AUDIO_SPOOL_DIR: str | None = Field(default=None, description="Directory for audio spool files (system temp dir when unset)")
+    VAD_ENABLED: bool = Field(default=True, description="Trim silence locally before transcription")
+    TRANSCRIBE_CHUNK_SEC: float = Field(default=120.0, description="Longer speech is split into chunks transcribed in parallel")
+    TRANSCRIBE_CHUNK_CONCURRENCY: int = Field(default=4, description="Max chunks of one recording uploaded to Groq at once")
+
+    # Background speech jobs (POST /tasks/speech/jobs)
+    SPEECH_JOB_WORKERS: int = Field(default=2, description="Speech jobs processed concurrently")
+    SPEECH_JOB_MAX_PENDING: int = Field(default=100, description="Queued jobs before new submissions get 503")
+    SPEECH_JOB_DIR: str | None = Field(
+        default=None,
+        description="Directory for queued job audio; must survive restarts to resume jobs (AUDIO_SPOOL_DIR when unset)"
+    )
+
+    # Speech pipeline cache (client 重試時直接回傳)
+    SPEECH_CACHE_ENABLED: bool = True
+    SPEECH_CACHE_TTL_SEC: int = 3600
+    SPEECH_CACHE_MAX_ENTRIES: int = 256
+    SPEECH_CACHE_PATH: str | None = Field(
+        default=None,
+        description="SQLite file for an on-disk speech cache; in-memory LRU when unset"
+    )
+
+    # Logging (request path 使用 queue handler，不直接寫 stdout)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_LEVELS: str = Field(
+        default="",
+        description="Per-module overrides, e.g. app.services.ai_service=DEBUG,httpx=WARNING"
+    )
+
+    # Profiling (預設關閉；關閉時不掛 middleware，零成本)
+    PROFILING_ENABLED: bool = Field(default=False, description="Profile requests under PROFILING_PATHS")
+    PROFILING_PATHS: str = Field(
+        default="/api/v1/dashboard,/api/v1/tasks",
+        description="Comma-separated path prefixes profiled when PROFILING_ENABLED"
+    )
+    PROFILING_SAMPLE_RATE: float = Field(default=1.0, description="Fraction of matching requests profiled")
+    PROFILING_SECRET: str | None = Field(
+        default=None,
+        description="HMAC key for the X-Profile header (profile one request on demand) and the /profiling endpoints"
+    )
+    PROFILING_DIR: str | None = Field(default=None, description="Directory for .prof files (system temp dir when unset)")
+    PROFILING_MAX_FILES: int = Field(default=50, description="Oldest profiles are deleted beyond this count")
+
+    # GET 回應快取 (dashboard / task list)：依資料版本失效，回應帶 ETag，If-None-Match 相符回 304
+    RESPONSE_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Cache serialized GET responses until tasks/users change; disable when running multiple workers"
+    )
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=128, description="Distinct cached query variants (LRU)")
+    DASHBOARD_MAX_STALENESS_SEC: float = Field(
+        default=30.0,
+        description="Max age of a cached dashboard; bounds how stale days_left / blackhole_days can be"
+    )
+
+    # Real-time push (GET /events SSE)
+    EVENTS_MIN_INTERVAL_SEC: float = Field(
+        default=1.0,
+        description="Changes are coalesced and pushed at most once per interval"
+    )
+    EVENTS_SUBSCRIBER_BUFFER: int = Field(
+        default=32,
+        description="Batches buffered per subscriber; a slower client gets a resync event instead"
+    )
+
+    # Blackhole decay (背景排程扣除，dashboard 讀取時不寫入)
+    BLACKHOLE_SWEEP_INTERVAL_SEC: float = Field(
+        default=300.0,
+        description="Seconds between blackhole decay sweeps over all users; <= 0 disables the scheduler"
+    )
 
     # Timezone for task scheduling
     TZ: str = "Asia/Taipei"
@@ -1,22 +1,64 @@
 # app/core/database.py
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.pool import Pool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+
+database_url = make_url(settings.DATABASE_URL)
+is_sqlite = database_url.get_backend_name() == "sqlite"
+# 記憶體資料庫每條連線各自一份，不能拆成讀寫兩個 engine
+is_sqlite_file = is_sqlite and database_url.database not in (None, "", ":memory:")
 
 # 根據資料庫類型決定連接參數
 # check_same_thread 是 SQLite 專用，PostgreSQL 不認識這個參數
 connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
+if is_sqlite:
     connect_args["check_same_thread"] = False
 
-# 連線池配置：處理遠端資料庫連線不穩定問題
-pool_settings = {
-    "pool_pre_ping": True,  # 每次從池中取連線前先測試是否存活
-    "pool_recycle": 3600,   # 1小時後回收連線，避免長時間閒置被伺服器關閉
-    "pool_size": 5,         # 連線池大小
-    "max_overflow": 10,     # 超過 pool_size 時最多再建立幾個臨時連線
-}
+# 連線池配置：處理遠端資料庫連線不穩定問題 (SQLite 是本機檔案，用 SQLAlchemy 預設即可)
+pool_settings = {}
+if not is_sqlite:
+    pool_settings = {
+        "pool_pre_ping": True,  # 每次從池中取連線前先測試是否存活
+        "pool_recycle": 3600,   # 1小時後回收連線，避免長時間閒置被伺服器關閉
+        "pool_size": 5,         # 連線池大小
+        "max_overflow": 10,     # 超過 pool_size 時最多再建立幾個臨時連線
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    每條新連線套用 SQLite 設定 (connect event)
+    - WAL：讀取不會被寫入擋住，多個讀取可以並行
+    - synchronous=NORMAL：WAL 下只在 checkpoint 時 fsync (斷電可能遺失最後幾筆交易，但不會損毀)
+    - busy_timeout：遇到鎖先等待而不是立即回 "database is locked"
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    # 負值代表 KiB
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KIB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+    cursor.close()
+
+
+def use_immediate_transactions(engine) -> None:
+    """
+    寫入用 engine：交易一開始就取得寫入鎖 (BEGIN IMMEDIATE)
+    預設的 deferred 交易先讀後寫時才升級鎖，與其他寫入者衝突會直接失敗，busy_timeout 也救不了
+    """
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        # 交給下面的 begin event 控制 BEGIN
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -24,9 +66,55 @@ engine = create_engine(
     **pool_settings
 )
 
+if is_sqlite:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+
 # 2. 建立 Session 工廠 (負責生產連線)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+# 2-1. Async 版本：API handler 使用，不佔用 threadpool
+# sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(async_database_url, **pool_settings)
+
+# 2-2. 寫入專用 engine
+# SQLite 同時只能有一個寫入者：所有寫入排隊使用同一條連線，讀取走 async_engine 並行
+# PostgreSQL 沒有這個限制，直接共用 async_engine
+async_write_engine = async_engine
+if is_sqlite_file:
+    async_write_engine = create_async_engine(async_database_url, pool_size=1, max_overflow=0)
+    use_immediate_transactions(async_write_engine.sync_engine)
+if is_sqlite:
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    if async_write_engine is not async_engine:
+        event.listen(async_write_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+# 每個 SQL statement 的次數與耗時 (/metrics 的 db_query_duration_seconds)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+if async_write_engine is not async_engine:
+    instrument_engine(async_write_engine.sync_engine, "async_write")
+
+# expire_on_commit=False：commit 後仍可直接讀取物件屬性，避免在 async 環境觸發 lazy load
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+# 會寫入的地方 (新增 / 修改 / 刪除任務、結算、語音 job、排程) 使用這個
+WriteSessionLocal = async_sessionmaker(async_write_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # 3. 定義 ORM 的基底類別 (之後所有的 Model 都要繼承它)
 
 
@@ -43,3 +131,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_write_db():
+    """會寫入的 endpoint 使用 (SQLite 下寫入排隊進同一條連線)"""
+    async with WriteSessionLocal() as db:
+        yield db
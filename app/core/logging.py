@@ -0,0 +1,94 @@
+# app/core/logging.py
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# LogRecord 內建欄位；其餘 (logger.info(..., extra={...})) 視為結構化欄位輸出
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: QueueListener | None = None
+
+
+class Lazy:
+    """
+    延遲計算的 log 參數：只有訊息真的要輸出時才呼叫 func (例如大型 payload 預覽)
+    logger.debug("raw: %s", Lazy(_preview, raw_text))
+    """
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self) -> str:
+        return str(self.func(*self.args))
+
+
+class JsonFormatter(logging.Formatter):
+    """一行一個 JSON 物件 (給 log 收集系統解析)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def parse_log_levels(spec: str) -> dict[str, str]:
+    """
+    "app.services.ai_service=DEBUG,httpx=WARNING" -> {"app.services.ai_service": "DEBUG", "httpx": "WARNING"}
+    """
+    levels: dict[str, str] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        if not level:
+            raise ValueError(f"Invalid LOG_LEVELS entry '{item}', expected module=LEVEL")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """
+    request path 上的 logger 只把 record 丟進 queue (不阻塞 event loop)，
+    由背景 thread 的 QueueListener 負責格式化與寫入 stdout
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in parse_log_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """送出 queue 中剩下的 log 後停止背景 thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
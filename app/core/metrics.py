@@ -0,0 +1,152 @@
+# app/core/metrics.py
+import re
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.transcript_policy import speech_counters
+
+# 語音流程一個階段可能要數十秒，API / DB 則是毫秒等級，分別設定 bucket
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+# SQL 第一個關鍵字當 label，其餘歸為 OTHER (避免 label 爆量)
+DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA"}
+PATH_PARAM_RE = re.compile(r"\{(\w+)(?::\w+)?\}")
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template (streaming responses: until the body ends)",
+    ["method", "route", "status"],
+    buckets=HTTP_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ["method"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time (count = number of queries)",
+    ["engine", "operation"],
+    buckets=DB_BUCKETS
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors",
+    "SQL statements that raised",
+    ["engine", "operation"]
+)
+SPEECH_STAGE_DURATION = Histogram(
+    "speech_stage_duration_seconds",
+    "Speech pipeline stage latency (read, transcode, vad, groq, gemini_correct, gemini_extract, save)",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+
+
+class SpeechCountersCollector:
+    """把 transcript_policy.speech_counters 以 Prometheus counter 輸出 (例如 speech_correction_skip_total)"""
+
+    def collect(self):
+        for name, value in speech_counters.snapshot().items():
+            metric = CounterMetricFamily(f"speech_{name}", f"Speech pipeline counter '{name}'")
+            metric.add_metric([], value)
+            yield metric
+
+
+REGISTRY.register(SpeechCountersCollector())
+
+
+def observe_speech_stage(name: str, seconds: float) -> None:
+    """StageTimer observe callback：每跑完一次階段 (含失敗、重試) 記一筆"""
+    SPEECH_STAGE_DURATION.labels(stage=name).observe(seconds)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in DB_OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    以 SQLAlchemy cursor 事件量測每個 statement
+    async engine 請傳 async_engine.sync_engine (事件在 greenlet 內的同步層觸發)
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        DB_QUERY_DURATION.labels(engine=name, operation=_operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.labels(engine=name, operation=_operation(context.statement or "")).inc()
+
+
+class PrometheusMiddleware:
+    """
+    純 ASGI middleware (不包裝 response，串流回應照常逐塊送出)
+    route label 用路由樣板 (/api/v1/tasks/{task_id})，沒有對應路由的請求歸為 "unmatched"
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method=method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method=method,
+                route=_route_template(scope),
+                status=str(status)
+            ).observe(time.perf_counter() - started)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    路由比對後 FastAPI 把 route / path_params 寫回同一個 scope；
+    include_router 的 route.path 可能不含 prefix，從實際路徑補回 (/api/v1/tasks/{task_id})
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    params = scope.get("path_params", {})
+    concrete = PATH_PARAM_RE.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    path = scope["path"]
+    if concrete and path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,206 @@
+# app/core/profiling.py
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# 簽章有效期限 (防止 header 外流後被重複使用)
+SIGNATURE_MAX_AGE_SEC = 300
+PROFILE_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+
+def profiling_configured() -> bool:
+    return settings.PROFILING_ENABLED or bool(settings.PROFILING_SECRET)
+
+
+def profile_dir() -> str:
+    return settings.PROFILING_DIR or os.path.join(tempfile.gettempdir(), "entropy_profiles")
+
+
+def _signature(method: str, path: str, timestamp: str) -> str:
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    return hmac.new(settings.PROFILING_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_profile_request(method: str, path: str) -> str:
+    """
+    產生 X-Profile header 的值 '<unix 秒>:<hmac>'，只對這個 method + path 有效
+    python -c "from app.core.profiling import sign_profile_request; print(sign_profile_request('GET', '/api/v1/dashboard/'))"
+    """
+    if not settings.PROFILING_SECRET:
+        raise ValueError("PROFILING_SECRET is not set")
+    timestamp = str(int(time.time()))
+    return f"{timestamp}:{_signature(method, path, timestamp)}"
+
+
+def verify_profile_signature(value: str | None, method: str, path: str) -> bool:
+    if not value or not settings.PROFILING_SECRET:
+        return False
+    timestamp, _, signature = value.partition(":")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE_SEC:
+        return False
+    return hmac.compare_digest(signature, _signature(method, path, timestamp))
+
+
+def _header(scope: Scope, name: str) -> str | None:
+    target = name.lower().encode()
+    for key, value in scope["headers"]:
+        if key == target:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    對選中的請求跑 cProfile，結果寫成 <id>.prof (+ <id>.json 描述) 並以 X-Profile-Id 回傳 id
+    - PROFILING_ENABLED：PROFILING_PATHS 底下的請求依 PROFILING_SAMPLE_RATE 抽樣
+    - PROFILING_SECRET：帶有效 X-Profile 簽章的單一請求
+    同一時間只跑一個 profiler (cProfile 無法重疊啟用)，忙碌時其他請求照常處理不 profile；
+    profiler 記錄的是整個 event loop thread，同時段其他請求的工作也會出現在結果中
+    只有 profiling_configured() 時才掛上，關閉時沒有任何額外成本
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._busy = threading.Lock()
+        self._prefixes = tuple(p.strip() for p in settings.PROFILING_PATHS.split(",") if p.strip())
+        # 查詢 profile 的端點也用 X-Profile 簽章驗證，不要把它自己也 profile 進去
+        self._excluded = f"{settings.API_V1_STR}/profiling"
+
+    def _selected(self, scope: Scope) -> bool:
+        if scope["path"].startswith(self._excluded):
+            return False
+        if verify_profile_signature(_header(scope, PROFILE_HEADER), scope["method"], scope["path"]):
+            return True
+        return (
+            settings.PROFILING_ENABLED
+            and scope["path"].startswith(self._prefixes)
+            and random.random() < settings.PROFILING_SAMPLE_RATE
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.lower().encode(), profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.disable()
+        finally:
+            self._busy.release()
+
+        meta = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            await asyncio.to_thread(_save_profile, profiler, meta)
+        except OSError as e:
+            logger.warning("⚠️ Failed to save profile %s: %s", profile_id, e)
+            return
+        logger.info("🔬 Profiled %s %s in %.1fms -> %s", meta["method"], meta["path"], meta["duration_ms"], profile_id)
+
+
+def _save_profile(profiler: cProfile.Profile, meta: dict) -> None:
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, f"{meta['id']}.prof"))
+    with open(os.path.join(directory, f"{meta['id']}.json"), "w") as f:
+        json.dump(meta, f)
+
+    # 輪替：id 以時間開頭，排序後刪掉最舊的
+    ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".prof"))
+    for old_id in ids[:-settings.PROFILING_MAX_FILES or None]:
+        for ext in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(directory, old_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> list[dict]:
+    """最新的在前"""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return profiles
+
+
+def summarize_profile(profile_id: str, limit: int = 30, sort: str = "cumulative") -> dict | None:
+    """
+    依 cumulative (含子呼叫) 或 tottime (函式本身) 排序的前 limit 個函式；找不到回傳 None
+    """
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    directory = profile_dir()
+    path = os.path.join(directory, f"{profile_id}.prof")
+    if not os.path.exists(path):
+        return None
+
+    stats = pstats.Stats(path)
+    column = 3 if sort == "cumulative" else 2
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+    functions = [
+        {
+            "function": f"{file}:{line}({name})",
+            "ncalls": ncalls,
+            "primitive_calls": primitive,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (file, line, name), (primitive, ncalls, tottime, cumtime, _) in rows
+    ]
+
+    meta = {"id": profile_id}
+    try:
+        with open(os.path.join(directory, f"{profile_id}.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+    return {**meta, "total_calls": stats.total_calls, "total_time": round(stats.total_tt, 6), "sort": sort, "functions": functions}
@@ -1,9 +1,21 @@
 # app/main.py
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import WriteSessionLocal
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.metrics import PrometheusMiddleware, render_metrics
+from app.core.profiling import PROFILE_ID_HEADER, ProfilingMiddleware, profiling_configured
 from app.api.v1.api import api_router
+from app.services.ai_service import ai_service
+from app.services.blackhole_scheduler import blackhole_scheduler
+from app.services.event_bus import event_bus
+from app.services.game_service import game_service
+from app.services.groq_client import groq_client
+from app.services.speech_job_service import speech_job_manager
 
 # 【重要】資料庫遷移現在使用 Alembic 管理
 # 不再使用 Base.metadata.create_all()
@@ -13,9 +25,32 @@ from app.api.v1.api import api_router
 # 開發時創建新遷移：
 #   alembic revision --autogenerate -m "描述"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 啟動：設定非阻塞 logging、建立預設 User (讀取路徑不再寫入)、建立長駐的 HTTP 連線池、預建 Gemini prompt 快取、啟動語音 job worker (並接續未完成的 job)、黑洞扣除排程、即時推播
+    setup_logging()
+    async with WriteSessionLocal() as db:
+        await game_service.ensure_user(db, user_id=1)
+        await db.commit()
+    await groq_client.start()
+    await ai_service.warm_up()
+    await speech_job_manager.start()
+    await blackhole_scheduler.start()
+    await event_bus.start()
+    yield
+    # 關閉：先停背景工作 (並結束 SSE 連線) 再釋放連線
+    await event_bus.stop()
+    await blackhole_scheduler.stop()
+    await speech_job_manager.stop()
+    await groq_client.close()
+    shutdown_logging()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # 👇 設定 CORS (Cross-Origin Resource Sharing)
@@ -32,15 +67,28 @@ origins = [
 if frontend_url := os.getenv("FRONTEND_URL"):
     origins.append(frontend_url)
 
+# 讓前端讀得到分頁 cursor、speech job 位置、GET 快取的 ETag (開 profiling 時還有 profile id)
+expose_headers = ["X-Next-Cursor", "Location", "ETag"]
+if profiling_configured():
+    expose_headers.append(PROFILE_ID_HEADER)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,      # 允許哪些網站連進來
     allow_credentials=True,     # 是否允許攜帶 Cookie
     allow_methods=["*"],        # 允許哪些 HTTP 方法 (GET, POST...)，"*" 代表全部允許
     allow_headers=["*"],        # 允許哪些 Header
+    expose_headers=expose_headers,
 )
 # 👆 設定結束
 
+# 需要時才掛 profiler (PROFILING_ENABLED 或 PROFILING_SECRET)，否則請求路徑上完全沒有它
+if profiling_configured():
+    app.add_middleware(ProfilingMiddleware)
+
+# 每個路由的延遲分佈、處理中的請求數 (最外層，含 CORS 處理時間)
+app.add_middleware(PrometheusMiddleware)
+
 # 掛載剛剛寫好的總路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -48,3 +96,10 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 @app.get("/")
 def root():
     return {"system": "EntroPy v1.0", "status": "operational"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus 文字格式：HTTP 延遲、DB 查詢、語音流程各階段耗時與計數"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,56 @@
+# app/models/speech_job.py
+from datetime import datetime, timezone
+from enum import Enum as PyEnum
+from sqlalchemy import String, Integer, DateTime, Enum, Text, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+def get_utc_now():
+    return datetime.now(timezone.utc)
+
+
+class SpeechJobStatus(str, PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class SpeechJob(Base):
+    """
+    背景語音處理 job (POST /tasks/speech/jobs)
+
+    音檔先落地到 audio_path，worker 跑完 Groq + Gemini 後把結果寫回這一列；
+    重啟時 queued / running 的 job 會重新排入佇列。
+    """
+    __tablename__ = "speech_jobs"
+    __table_args__ = (
+        # 啟動時撈出未完成的 job (migration 003)
+        Index("ix_speech_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    status: Mapped[SpeechJobStatus] = mapped_column(Enum(SpeechJobStatus), default=SpeechJobStatus.QUEUED)
+    # 最後完成的階段 (read / transcode / groq / gemini_correct / gemini_extract / save)
+    stage: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    # 上傳音檔 (job 結束後刪除)
+    audio_path: Mapped[str | None] = mapped_column(String, nullable=True)
+    audio_sha256: Mapped[str] = mapped_column(String(64))
+    filename: Mapped[str] = mapped_column(String)
+    mime_type: Mapped[str] = mapped_column(String)
+
+    # 結果
+    transcript: Mapped[str | None] = mapped_column(Text, nullable=True)
+    task_ids: Mapped[list[int] | None] = mapped_column(JSON, nullable=True)
+    timings: Mapped[dict[str, float] | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=get_utc_now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=get_utc_now, onupdate=get_utc_now)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<SpeechJob {self.id} ({self.status})>"
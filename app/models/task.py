@@ -1,7 +1,7 @@
 # app/models/task.py
 from datetime import datetime, timezone
 from enum import Enum as PyEnum
-from sqlalchemy import String, Integer, DateTime, Enum
+from sqlalchemy import String, Integer, DateTime, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -27,6 +27,12 @@ class TaskStatus(str, PyEnum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # GET /tasks 篩選用 (migration 002)
+        Index("ix_tasks_status_type_deadline", "status", "type", "deadline"),
+        # GET /tasks 篩選 + 依 id 的 keyset 分頁 (migration 004)
+        Index("ix_tasks_status_type_id", "status", "type", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, index=True)
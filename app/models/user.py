@@ -6,7 +6,8 @@ from app.core.database import Base
 
 
 def get_utc_now():
-    return datetime.now(timezone.utc)
+    # users 表的時間欄位是 naive DateTime，一律存 UTC (asyncpg 不接受 aware datetime 寫入 naive 欄位)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class User(Base):
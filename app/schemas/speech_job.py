@@ -0,0 +1,21 @@
+# app/schemas/speech_job.py
+from datetime import datetime
+from pydantic import BaseModel
+from app.models.speech_job import SpeechJobStatus
+from app.schemas.task import TaskResponse
+
+
+class SpeechJobResponse(BaseModel):
+    id: str
+    status: SpeechJobStatus
+    # 最後完成的階段與各階段耗時 (秒)
+    stage: str | None = None
+    timings: dict[str, float] = {}
+    # 成功後才有
+    transcript: str | None = None
+    tasks: list[TaskResponse] = []
+    # 失敗時的原因與對應的 HTTP 狀態碼 (同步版 /tasks/speech 會回的那個)
+    error: str | None = None
+    error_status: int | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
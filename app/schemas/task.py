@@ -32,6 +32,15 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     pass
 
+# 2-1. Bulk Create：一次匯入多筆任務
+
+
+MAX_BULK_TASKS = 1000
+
+
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskCreate] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+
 # 3. Update：允許單獨更新難度
 
 
@@ -1,35 +1,93 @@
 # app/services/ai_service.py
 import asyncio
+import functools
 import json
+import logging
+import random
 import re
-import subprocess
-import tempfile
+import time
+import wave
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
 from typing import Any
 
+import httpx
 import pytz
-import requests
 from fastapi import UploadFile, HTTPException
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 from pydantic import ValidationError
 
 from app.core.config import settings
+from app.core.logging import Lazy
+from app.core.metrics import observe_speech_stage
 from app.schemas.task import TaskCreate
+from app.services.audio_spool import AudioSpool
+from app.services.groq_client import groq_client
+from app.services.prompt_cache import gemini_context_cache
+from app.services.speech_cache import speech_cache
+from app.services.transcript_policy import (
+    CorrectionPlan,
+    CorrectionWindow,
+    plan_correction,
+    speech_counters,
+)
+from app.services.vad import plan_chunks, trim_silence
+from app.utils.json_stream import JsonArrayItemStream
+from app.utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
 
 # 初始化新版 Client
-client = genai.Client(api_key=settings.GEMINI_API_KEY) if settings.GEMINI_API_KEY else None
+client = genai.Client(
+    api_key=settings.GEMINI_API_KEY,
+    http_options=types.HttpOptions(base_url=settings.GEMINI_API_BASE_URL) if settings.GEMINI_API_BASE_URL else None
+) if settings.GEMINI_API_KEY else None
 
 DEFAULT_GEMINI_MODEL = "gemini-3-flash-preview"
-GROQ_TRANSCRIBE_URL = "https://api.groq.com/openai/v1/audio/transcriptions"
 GROQ_MODEL = "whisper-large-v3-turbo"
 GROQ_LANGUAGE = "zh"
 GEMINI_AUDIO_TIMEOUT_SEC = 90
 GEMINI_TEXT_TIMEOUT_SEC = 45
-GROQ_TIMEOUT_SEC = 90
+# 啟動時建立 context cache 最多等這麼久，不拖慢開機
+GEMINI_WARM_UP_TIMEOUT_SEC = 10
 MAX_RETRIES = 3
+# 重試退避：指數成長 + full jitter
+RETRY_BASE_DELAY_SEC = 0.5
+RETRY_MAX_DELAY_SEC = 8.0
 MIN_AUDIO_BYTES = 500
 MIN_AUDIO_DURATION_SEC = 0.5
+# ffmpeg 輸出格式：16k mono s16le
+WAV_SAMPLE_RATE = 16000
+WAV_CHANNELS = 1
+
+
+def _budget_deadline() -> float:
+    return time.monotonic() + settings.GEMINI_EXTRACT_BUDGET_SEC
+
+
+def _attempt_timeout(deadline: float) -> float:
+    """單次呼叫的逾時：不超過 GEMINI_TEXT_TIMEOUT_SEC，也不超過剩餘的總時限"""
+    return min(GEMINI_TEXT_TIMEOUT_SEC, deadline - time.monotonic())
+
+
+async def _backoff(attempt: int, deadline: float) -> None:
+    """指數退避 + full jitter：等待 0 ~ min(上限, base * 2^(attempt-1)) 秒，不超過剩餘時限"""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY_SEC, RETRY_BASE_DELAY_SEC * 2 ** (attempt - 1)))
+    delay = min(delay, max(deadline - time.monotonic(), 0))
+    if delay > 0:
+        logger.info("⏳ Backing off %.2fs before retry", delay)
+        await asyncio.sleep(delay)
+
+
+def _is_context_cache_error(error: Exception, config: types.GenerateContentConfig) -> bool:
+    """
+    只有 context cache 本身失效 (被刪除 / 過期 / 無權限) 才算；429 等其他 4xx 交給一般重試與退避
+    """
+    if config.cached_content is None or not isinstance(error, genai_errors.ClientError):
+        return False
+    return error.code in (403, 404) or "cachedContents" in str(error)
 
 
 def _preview(text: str, limit: int = 1200) -> str:
@@ -41,117 +99,404 @@ def _preview(text: str, limit: int = 1200) -> str:
 
 class AIService:
     @staticmethod
-    async def process_audio_instruction(file: UploadFile) -> tuple[list[TaskCreate], str]:
+    def _ensure_configured() -> None:
+        if not client:
+            raise HTTPException(status_code=500, detail="Gemini API Key not configured")
+        if not settings.GROQ_API_KEY:
+            raise HTTPException(status_code=500, detail="Groq API Key not configured")
+
+    @staticmethod
+    async def process_audio_instruction(
+        file: UploadFile,
+        on_stage: Callable[[str, float], None] | None = None
+    ) -> tuple[list[TaskCreate], str, dict[str, float]]:
         """
         兩段式流程：
         1) Groq Whisper 取得 rough transcript + segments
         2) Gemini 多模態校正 transcript（音檔 + Groq 結果）
         3) Gemini 文字模式做任務抽取（使用校正後 transcript）
+        回傳 (tasks, transcript, 各階段耗時秒數)；on_stage(name, seconds) 在每個階段完成時呼叫
         """
-        if not client:
-            raise HTTPException(status_code=500, detail="Gemini API Key not configured")
-        if not settings.GROQ_API_KEY:
-            raise HTTPException(status_code=500, detail="Groq API Key not configured")
+        AIService._ensure_configured()
+        timer = StageTimer(on_stage=on_stage, observe=observe_speech_stage)
 
-        local_tz = pytz.timezone(settings.TZ)
-        now = datetime.now(local_tz)
-        current_time_str = now.strftime("%Y-%m-%d %A %H:%M")
-        model_name = getattr(settings, "GEMINI_MODEL", DEFAULT_GEMINI_MODEL) or DEFAULT_GEMINI_MODEL
+        # 分塊串流寫入單一暫存檔 (同時算 hash、超過上限立即 413)，不把整個上傳讀進記憶體
+        with timer.stage("read"):
+            upload = await AudioSpool.from_upload(file, settings.MAX_AUDIO_UPLOAD_BYTES)
+        try:
+            return await AIService.process_audio_spool(
+                upload,
+                mime_type=file.content_type or "audio/mp3",
+                filename=file.filename or "audio.webm",
+                timer=timer
+            )
+        finally:
+            upload.close()
 
-        file_content = await file.read()
-        mime_type = file.content_type or "audio/mp3"
-        filename = file.filename or "audio.webm"
-        if len(file_content) < MIN_AUDIO_BYTES:
-            print(f"⛔ Audio too small ({len(file_content)} bytes) < MIN_AUDIO_BYTES={MIN_AUDIO_BYTES}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Audio too small ({len(file_content)} bytes). Recording/upload likely failed."
+    @staticmethod
+    async def process_audio_spool(
+        upload: AudioSpool,
+        mime_type: str,
+        filename: str,
+        timer: StageTimer | None = None
+    ) -> tuple[list[TaskCreate], str, dict[str, float]]:
+        """
+        已落地的音檔 -> (tasks, transcript, timings)；背景 job 直接從這裡進入，暫存檔由呼叫端關閉
+        """
+        AIService._ensure_configured()
+        timer = timer or StageTimer(observe=observe_speech_stage)
+        model_name, current_time_str, date_bucket = AIService._request_context()
+
+        transcript_clean = await AIService._resolve_transcript(upload, mime_type, filename, model_name, timer)
+
+        tasks = await speech_cache.get_tasks(transcript_clean, date_bucket, model_name)
+        if tasks is not None:
+            logger.info("♻️ Task extraction cache hit (%d tasks)", len(tasks))
+        else:
+            with timer.stage("gemini_extract"):
+                tasks = await AIService._gemini_extract_tasks(
+                    model_name=model_name,
+                    transcript=transcript_clean,
+                    current_time_str=current_time_str
+                )
+            await speech_cache.set_tasks(transcript_clean, date_bucket, model_name, tasks)
+
+        logger.info("✅ Parsed %d tasks; transcript length=%d characters.", len(tasks), len(transcript_clean))
+        logger.info("⏱️ Stage timings: %s", timer.summary())
+        timings = {**timer.timings, "total": timer.total()}
+        return tasks, transcript_clean, timings
+
+    @staticmethod
+    async def stream_audio_instruction(file: UploadFile) -> AsyncIterator[tuple[str, Any]]:
+        """
+        串流版：任務一組好就先送出，不等 Gemini 整份 JSON
+        依序產生 ("transcript", str) -> ("task", TaskCreate) ... -> ("timings", dict)
+        """
+        AIService._ensure_configured()
+        timer = StageTimer(observe=observe_speech_stage)
+        model_name, current_time_str, date_bucket = AIService._request_context()
+
+        with timer.stage("read"):
+            upload = await AudioSpool.from_upload(file, settings.MAX_AUDIO_UPLOAD_BYTES)
+        try:
+            transcript_clean = await AIService._resolve_transcript(
+                upload,
+                file.content_type or "audio/mp3",
+                file.filename or "audio.webm",
+                model_name,
+                timer
             )
+        finally:
+            upload.close()
+        yield "transcript", transcript_clean
 
-        source_suffix = AIService._guess_suffix(filename, mime_type)
-        probe_info = await AIService._probe_audio(file_content, source_suffix)
-        audio_stream = next((s for s in probe_info.get("streams", []) if s.get("codec_type") == "audio"), None)
-        duration = float(
-            (audio_stream or {}).get("duration")
-            or probe_info.get("format", {}).get("duration")
-            or 0
-        )
-        if not audio_stream or duration < MIN_AUDIO_DURATION_SEC:
-            print(f"⛔ Invalid audio stream or too short. duration={duration:.2f}s streams={len(probe_info.get('streams', []))}")
+        tasks = await speech_cache.get_tasks(transcript_clean, date_bucket, model_name)
+        if tasks is not None:
+            logger.info("♻️ Task extraction cache hit (%d tasks)", len(tasks))
+            for task in tasks:
+                yield "task", task
+        else:
+            tasks = []
+            # 這段耗時包含呼叫端處理每個任務的時間 (例如寫入資料庫)
+            with timer.stage("gemini_extract"):
+                async for task in AIService._gemini_stream_tasks(
+                    model_name=model_name,
+                    transcript=transcript_clean,
+                    current_time_str=current_time_str
+                ):
+                    if not tasks:
+                        timer.mark("first_task")
+                    tasks.append(task)
+                    yield "task", task
+            await speech_cache.set_tasks(transcript_clean, date_bucket, model_name, tasks)
+
+        logger.info("✅ Streamed %d tasks; transcript length=%d characters.", len(tasks), len(transcript_clean))
+        logger.info("⏱️ Stage timings: %s", timer.summary())
+        yield "timings", {**timer.timings, "total": timer.total()}
+
+    @staticmethod
+    async def warm_up() -> None:
+        """
+        啟動時預先建好靜態 prompt / schema / config，並建立 Gemini context cache (失敗不影響啟動)
+        """
+        AIService._tasks_config(None)
+        AIService._transcript_config()
+        if client is None:
+            return
+        model_name = AIService._request_context()[0]
+        try:
+            await asyncio.wait_for(
+                gemini_context_cache.get(client, model_name, AIService._build_prompt()),
+                timeout=GEMINI_WARM_UP_TIMEOUT_SEC
+            )
+        except asyncio.TimeoutError:
+            logger.warning("⏱️ Gemini context cache warm-up timed out; it will be created on first use")
+
+    @staticmethod
+    def _request_context() -> tuple[str, str, str]:
+        """
+        回傳 (model_name, 當下時間字串, 日期分桶)
+        相對日期 (明天/下週一) 依當天解讀，任務快取以日期分桶
+        """
+        now = datetime.now(pytz.timezone(settings.TZ))
+        model_name = getattr(settings, "GEMINI_MODEL", DEFAULT_GEMINI_MODEL) or DEFAULT_GEMINI_MODEL
+        return model_name, now.strftime("%Y-%m-%d %A %H:%M"), now.strftime("%Y-%m-%d")
+
+    @staticmethod
+    async def _resolve_transcript(
+        upload: AudioSpool,
+        mime_type: str,
+        filename: str,
+        model_name: str,
+        timer: StageTimer
+    ) -> str:
+        if upload.size < MIN_AUDIO_BYTES:
+            logger.warning("⛔ Audio too small (%d bytes) < MIN_AUDIO_BYTES=%d", upload.size, MIN_AUDIO_BYTES)
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid audio stream or too short (duration={duration:.2f}s)"
+                detail=f"Audio too small ({upload.size} bytes). Recording/upload likely failed."
             )
 
-        wav_bytes, wav_mime = await AIService._convert_to_wav(file_content, source_suffix, mime_type)
+        transcript_clean = await speech_cache.get_transcript(upload.sha256, model_name)
+        if transcript_clean:
+            logger.info("♻️ Transcript cache hit (audio sha256=%.12s)", upload.sha256)
+            return transcript_clean
+        return await AIService._transcribe_audio(upload, mime_type, filename, model_name, timer)
+
+    @staticmethod
+    async def _transcribe_audio(
+        upload: AudioSpool,
+        mime_type: str,
+        filename: str,
+        model_name: str,
+        timer: StageTimer
+    ) -> str:
+        """
+        音檔 -> 清理後的 transcript (ffmpeg -> Groq -> Gemini 校正)，結果依音檔 hash 快取
+        """
+        # 驗證音軌 + 轉 16k mono wav 合併為一次 ffmpeg (讀寫暫存檔路徑)
+        with timer.stage("transcode"):
+            wav, wav_mime, duration = await AIService._transcode_audio(upload, mime_type)
+        try:
+            if duration is not None and duration < MIN_AUDIO_DURATION_SEC:
+                logger.warning("⛔ Audio too short. duration=%.2fs", duration)
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid audio stream or too short (duration={duration:.2f}s)"
+                )
+            if wav_mime != "audio/wav" or not settings.VAD_ENABLED:
+                return await AIService._transcribe_wav(wav, wav_mime, upload, filename, model_name, timer)
+
+            # 本地 VAD 去掉靜音，Groq 與 Gemini 都只收到有人聲的部分
+            with timer.stage("vad"):
+                vad = await asyncio.to_thread(trim_silence, wav)
+            try:
+                if vad.speech_sec < MIN_AUDIO_DURATION_SEC:
+                    logger.warning("⛔ No speech detected. speech=%.2fs of %.2fs", vad.speech_sec, vad.original_sec)
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"No speech detected (speech={vad.speech_sec:.2f}s)"
+                    )
+                if vad.trimmed:
+                    logger.info("🔇 VAD trimmed silence: %.2fs -> %.2fs", vad.original_sec, vad.speech_sec)
+                    speech_counters.incr("vad_trimmed_sec", vad.original_sec - vad.speech_sec)
+                chunks = plan_chunks(vad.speech_sec, vad.boundaries, settings.TRANSCRIBE_CHUNK_SEC)
+                return await AIService._transcribe_wav(
+                    vad.audio, wav_mime, upload, filename, model_name, timer,
+                    chunks=chunks,
+                    trimmed=vad.trimmed
+                )
+            finally:
+                if vad.audio is not wav:
+                    vad.audio.close()
+        finally:
+            if wav is not upload:
+                wav.close()
+
+    @staticmethod
+    async def _transcribe_wav(
+        wav: AudioSpool,
+        wav_mime: str,
+        upload: AudioSpool,
+        filename: str,
+        model_name: str,
+        timer: StageTimer,
+        chunks: list[tuple[float, float]] | None = None,
+        trimmed: bool = False
+    ) -> str:
+        """
+        Groq 轉錄 + Gemini 校正 (wav 與上傳原檔都在暫存檔，用完由呼叫端關閉)
+        chunks 超過一段時並行轉錄再接回；segments 時間以 (去靜音後的) wav 為準
+        """
+        # 去靜音後 segments 的時間軸不同，Groq 結果分開存；校正後的 transcript 一律存在原檔 hash 下 (_resolve_transcript 以此查詢)
+        groq_key = f"{upload.sha256}:vad" if trimmed else upload.sha256
         wav_name = "audio.wav" if wav_mime == "audio/wav" else filename
 
-        print(f"🎧 Audio received: {len(file_content)} bytes, mime={mime_type}, name={filename}")
-        print(f"🛰️ Using model: {model_name}")
+        logger.info("🎧 Audio received: %d bytes (sending %d bytes), mime=%s, name=%s", upload.size, wav.size, wav_mime, filename)
+        logger.info("🛰️ Using model: %s", model_name)
 
-        groq_result = await AIService._groq_transcribe(wav_bytes, wav_name, wav_mime)
+        # Groq -> Gemini 校正 -> Gemini 抽取 之間有資料相依，只能依序執行
+        groq_result = await speech_cache.get_groq(groq_key)
+        if groq_result is not None:
+            logger.info("♻️ Groq cache hit (audio sha256=%.12s)", groq_key)
+        else:
+            with timer.stage("groq"):
+                if chunks and len(chunks) > 1:
+                    groq_result = await AIService._groq_transcribe_chunks(wav, chunks)
+                else:
+                    groq_result = await AIService._groq_transcribe(wav, wav_name, wav_mime)
+            await speech_cache.set_groq(groq_key, groq_result)
         rough_transcript = (groq_result.get("text") or "").strip()
         rough_segments = groq_result.get("segments") or []
         if not rough_transcript:
-            print("⛔ Groq transcription returned empty text")
+            logger.warning("⛔ Groq transcription returned empty text")
             raise HTTPException(status_code=400, detail="Groq transcription returned empty text")
-        print(f"📝 Groq transcript len={len(rough_transcript)}, segments={len(rough_segments)}")
-
-        corrected_transcript = await AIService._gemini_correct_transcript(
-            model_name=model_name,
-            file_content=wav_bytes,
-            mime_type=wav_mime,
-            rough_transcript=rough_transcript,
-            rough_segments=rough_segments
-        )
+        logger.info("📝 Groq transcript len=%d, segments=%d", len(rough_transcript), len(rough_segments))
+
+        # 依 Whisper 信心決定要不要校正、校正哪些片段 (切窗需要 ffmpeg 轉出的 PCM wav)
+        plan = plan_correction(rough_segments)
+        if plan.mode == "partial" and wav_mime != "audio/wav":
+            plan = CorrectionPlan("full", f"{plan.reason}; audio not PCM wav, cannot cut windows")
+        logger.info("🧭 Correction plan: %s (%s)", plan.mode, plan.reason)
+        audio_sec = max((seg.get("end", 0.0) for seg in rough_segments), default=0.0)
+        speech_counters.incr(f"correction_{plan.mode}")
+        speech_counters.incr("correction_audio_sec_total", audio_sec)
+
+        if plan.mode == "skip":
+            corrected_transcript = rough_transcript
+        elif plan.mode == "partial":
+            speech_counters.incr("correction_audio_sec_sent", sum(w.end - w.start for w in plan.windows))
+            with timer.stage("gemini_correct"):
+                corrected_transcript = await AIService._correct_windows(
+                    model_name, wav, rough_segments, plan.windows
+                )
+        else:
+            speech_counters.incr("correction_audio_sec_sent", audio_sec)
+            with timer.stage("gemini_correct"):
+                corrected_transcript = await AIService._gemini_correct_transcript(
+                    model_name=model_name,
+                    file_content=wav.read_bytes(),
+                    mime_type=wav_mime,
+                    rough_transcript=rough_transcript,
+                    rough_segments=rough_segments
+                )
+        if not corrected_transcript:
+            speech_counters.incr("correction_fallback")
         transcript_clean = AIService._clean_transcript(corrected_transcript or rough_transcript)
 
-        tasks = await AIService._gemini_extract_tasks(
-            model_name=model_name,
-            transcript=transcript_clean,
-            current_time_str=current_time_str
-        )
+        # 校正失敗時退回 Groq 粗稿，這種結果不快取，重試時再校正一次
+        if corrected_transcript:
+            await speech_cache.set_transcript(upload.sha256, model_name, transcript_clean)
+        return transcript_clean
+
+    @staticmethod
+    async def _correct_windows(
+        model_name: str,
+        wav: AudioSpool,
+        segments: list[dict],
+        windows: tuple[CorrectionWindow, ...]
+    ) -> str | None:
+        """
+        只把低信心片段的音訊窗 (連同該段粗稿) 並行送去校正，再依序拼回整份 transcript。
+        任何一個窗校正失敗回傳 None (整份退回 Groq 粗稿，不快取)。
+        """
+        logger.info("✂️ Correcting %d low-confidence windows: %s", len(windows), Lazy(
+            lambda: ", ".join(f"{w.start:.1f}-{w.end:.1f}s" for w in windows)
+        ))
+        window_segments = [segments[w.first_segment:w.last_segment + 1] for w in windows]
+        results = await asyncio.gather(*(
+            AIService._gemini_correct_transcript(
+                model_name=model_name,
+                file_content=wav.read_wav_window(window.start, window.end),
+                mime_type="audio/wav",
+                rough_transcript="".join(seg.get("text", "") for seg in segs).strip(),
+                rough_segments=segs
+            )
+            for window, segs in zip(windows, window_segments)
+        ))
+        if any(result is None for result in results):
+            return None
+
+        pieces: list[str] = []
+        cursor = 0
+        for window, corrected in zip(windows, results):
+            pieces.extend(seg.get("text", "") for seg in segments[cursor:window.first_segment])
+            # 英文等以空白分詞的語言，Whisper 片段會以空白開頭
+            leading = " " if segments[window.first_segment].get("text", "").startswith(" ") else ""
+            pieces.append(leading + corrected)
+            cursor = window.last_segment + 1
+        pieces.extend(seg.get("text", "") for seg in segments[cursor:])
+        return "".join(pieces).strip()
+
+    @staticmethod
+    async def _groq_transcribe_chunks(wav: AudioSpool, chunks: list[tuple[float, float]]) -> dict:
+        """
+        長音檔切成多段並行轉錄 (TRANSCRIBE_CHUNK_CONCURRENCY 限制同時上傳數)，
+        再把各段文字與 segments (時間加上該段起點) 接回一份 verbose_json
+        """
+        logger.info("🧩 Transcribing %d chunks: %s", len(chunks), Lazy(
+            lambda: ", ".join(f"{a:.1f}-{b:.1f}s" for a, b in chunks)
+        ))
+        semaphore = asyncio.Semaphore(settings.TRANSCRIBE_CHUNK_CONCURRENCY)
+
+        async def transcribe_chunk(index: int, start: float, end: float) -> dict:
+            async with semaphore:
+                return await AIService._groq_transcribe(
+                    wav.read_wav_window(start, end), f"chunk{index}.wav", "audio/wav"
+                )
+
+        results = await asyncio.gather(*(
+            transcribe_chunk(i, start, end) for i, (start, end) in enumerate(chunks)
+        ))
 
-        print(f"✅ Parsed {len(tasks)} tasks; transcript length={len(transcript_clean)} characters.")
-        return tasks, transcript_clean
+        segments: list[dict] = []
+        texts: list[str] = []
+        for (offset, _), result in zip(chunks, results):
+            chunk_segments = result.get("segments") or []
+            for seg in chunk_segments:
+                segments.append({
+                    **seg,
+                    "id": len(segments),
+                    "start": seg.get("start", 0.0) + offset,
+                    "end": seg.get("end", 0.0) + offset,
+                })
+            texts.append("".join(seg.get("text", "") for seg in chunk_segments) or (result.get("text") or ""))
+        return {"text": "".join(texts).strip(), "segments": segments, "duration": chunks[-1][1]}
 
     @staticmethod
-    async def _groq_transcribe(file_content: bytes, filename: str, mime_type: str) -> dict:
+    async def _groq_transcribe(audio: AudioSpool | bytes, filename: str, mime_type: str) -> dict:
         """
-        呼叫 Groq Whisper 取得逐字稿（verbose_json 含 segments）。
+        呼叫 Groq Whisper 取得逐字稿（verbose_json 含 segments），暫存檔直接串流上傳。
         """
-        headers = {"Authorization": f"Bearer {settings.GROQ_API_KEY}"}
-        files = {"file": (filename, file_content, mime_type)}
         data = {
             "model": GROQ_MODEL,
             "response_format": "verbose_json",
             "language": GROQ_LANGUAGE,
         }
 
-        def _call():
-            print(f"📤 Groq request: model={GROQ_MODEL}, filename={filename}, mime={mime_type}, bytes={len(file_content)}, format=verbose_json, language={GROQ_LANGUAGE}")
-            resp = requests.post(
-                GROQ_TRANSCRIBE_URL,
-                headers=headers,
-                files=files,
-                data=data,
-                timeout=GROQ_TIMEOUT_SEC
-            )
-            resp.raise_for_status()
-            resp_json = resp.json()
-            print(f"📥 Groq response: {_preview(json.dumps(resp_json, ensure_ascii=False))}")
-            return resp_json
+        if isinstance(audio, AudioSpool):
+            payload, size = audio.open_for_read(), audio.size
+        else:
+            payload, size = audio, len(audio)
 
+        logger.info(
+            "📤 Groq request: model=%s, filename=%s, mime=%s, bytes=%d, format=verbose_json, language=%s",
+            GROQ_MODEL, filename, mime_type, size, GROQ_LANGUAGE
+        )
         try:
-            return await asyncio.to_thread(_call)
-        except requests.HTTPError as e:
-            detail = f"Groq transcription failed: {e.response.text if e.response else str(e)}"
-            print(f"❌ {detail}")
+            resp_json = await groq_client.transcribe(payload, filename, mime_type, data)
+        except httpx.HTTPStatusError as e:
+            detail = f"Groq transcription failed: {e.response.text}"
+            logger.error("❌ %s", detail)
             raise HTTPException(status_code=502, detail=detail)
         except Exception as e:
-            print(f"❌ Groq transcription error: {e}")
+            logger.error("❌ Groq transcription error: %s", e)
             raise HTTPException(status_code=500, detail=f"Groq transcription error: {e}")
 
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📥 Groq response: %s", _preview(json.dumps(resp_json, ensure_ascii=False)))
+        return resp_json
+
     @staticmethod
     async def _gemini_correct_transcript(
         model_name: str,
@@ -159,9 +504,10 @@ class AIService:
         mime_type: str,
         rough_transcript: str,
         rough_segments: list[dict]
-    ) -> str:
+    ) -> str | None:
         """
         多模態校正逐字稿：音檔 + Groq 粗稿 → 更準的 transcript。
+        校正失敗 (逾時/錯誤/解析失敗) 回傳 None，由呼叫端退回 Groq 粗稿。
         """
         context_block = (
             "你是一個語音校正器，會同時收到原始音檔與 Whisper 粗稿。"
@@ -169,8 +515,8 @@ class AIService:
             f"Whisper transcript (rough):\n{rough_transcript}\n\n"
             f"Whisper segments (rough JSON):\n{json.dumps(rough_segments, ensure_ascii=False)}"
         )
-        print(f"📤 Gemini transcript input: system='語音校正', audio_bytes={len(file_content)}, mime={mime_type}")
-        print(f"📤 Gemini transcript context preview: {_preview(context_block)}")
+        logger.info("📤 Gemini transcript input: system='語音校正', audio_bytes=%d, mime=%s", len(file_content), mime_type)
+        logger.debug("📤 Gemini transcript context preview: %s", Lazy(_preview, context_block))
 
         try:
             response = await asyncio.wait_for(
@@ -180,32 +526,27 @@ class AIService:
                         types.Part.from_bytes(data=file_content, mime_type=mime_type),
                         types.Part.from_text(text=context_block),
                     ],
-                    config=types.GenerateContentConfig(
-                        system_instruction="你是語音校正專家，只輸出校正後的 transcript JSON 物件，禁止編造內容。",
-                        response_mime_type="application/json",
-                        response_schema=AIService._transcript_schema(),
-                        temperature=0
-                    )
+                    config=AIService._transcript_config()
                 ),
                 timeout=GEMINI_AUDIO_TIMEOUT_SEC
             )
         except asyncio.TimeoutError:
-            print(f"⏱️ Gemini transcript correction timed out after {GEMINI_AUDIO_TIMEOUT_SEC}s, fallback to Groq text.")
-            return rough_transcript
+            logger.warning("⏱️ Gemini transcript correction timed out after %ss, fallback to Groq text.", GEMINI_AUDIO_TIMEOUT_SEC)
+            return None
         except Exception as e:
-            print(f"❌ Gemini transcript correction error: {e}, fallback to Groq text.")
-            return rough_transcript
+            logger.error("❌ Gemini transcript correction error: %s, fallback to Groq text.", e)
+            return None
 
         raw_text = response.text or ""
-        print(f"🧠 Gemini transcript output len={len(raw_text)}")
-        print(f"📥 Gemini transcript raw: {_preview(raw_text)}")
+        logger.info("🧠 Gemini transcript output len=%d", len(raw_text))
+        logger.debug("📥 Gemini transcript raw: %s", Lazy(_preview, raw_text))
         try:
             parsed = json.loads(raw_text)
             transcript = (parsed.get("transcript") or "").strip()
-            return transcript or rough_transcript
+            return transcript or None
         except Exception as e:
-            print(f"❌ Transcript parse error: {e}, fallback to Groq text.")
-            return rough_transcript
+            logger.error("❌ Transcript parse error: %s, fallback to Groq text.", e)
+            return None
 
     @staticmethod
     async def _gemini_extract_tasks(
@@ -215,48 +556,246 @@ class AIService:
     ) -> list[TaskCreate]:
         """
         純文字模式抽取任務（避免再傳音檔，降低延遲）。
+        逐項驗證：合格的任務直接保留，只把不合格的項目送回 Gemini 修正；
+        重試採指數退避 + jitter，整段抽取受 GEMINI_EXTRACT_BUDGET_SEC 總時限約束。
         """
-        system_prompt = AIService._build_prompt(current_time_str)
+        deadline = _budget_deadline()
         last_error: str | None = None
+        parse_feedback: str | None = None
 
         for attempt in range(1, MAX_RETRIES + 1):
-            user_text = transcript if not last_error else f"{transcript}\n先前錯誤：{last_error}"
-            print(f"🚀 Gemini task extraction (attempt {attempt})...")
-            print(f"📤 Gemini tasks input: system_prompt_len={len(system_prompt)}, transcript_preview={_preview(user_text)}")
+            timeout = _attempt_timeout(deadline)
+            if timeout <= 0:
+                last_error = f"extraction budget of {settings.GEMINI_EXTRACT_BUDGET_SEC}s exhausted ({last_error})"
+                break
+
+            # 只有輸出格式錯誤才回饋給模型，連線/逾時錯誤原樣重送
+            body = transcript if not parse_feedback else f"{transcript}\n先前錯誤：{parse_feedback}"
+            user_text = AIService._task_user_text(current_time_str, body)
+            logger.info("🚀 Gemini task extraction (attempt %d)...", attempt)
+            logger.debug("📤 Gemini tasks input: %s", Lazy(_preview, user_text))
             try:
-                response = await asyncio.wait_for(
-                    client.aio.models.generate_content(
-                        model=model_name,
-                        contents=[types.Part.from_text(text=user_text)],
-                        config=types.GenerateContentConfig(
-                            system_instruction=system_prompt,
-                            response_mime_type="application/json",
-                            response_schema=AIService._tasks_response_schema(),
-                            temperature=0
-                        )
-                    ),
-                    timeout=GEMINI_TEXT_TIMEOUT_SEC
-                )
+                raw_text = await AIService._gemini_generate_tasks(model_name, user_text, timeout)
+                tasks, failures = AIService._parse_ai_output(raw_text)
             except asyncio.TimeoutError:
-                last_error = f"Gemini task extraction timeout after {GEMINI_TEXT_TIMEOUT_SEC}s"
-                print(f"⏱️ {last_error}")
+                last_error = f"Gemini task extraction timeout after {timeout:.1f}s"
+                logger.warning("⏱️ %s", last_error)
+                await _backoff(attempt, deadline)
+                continue
+            except ValueError as parse_error:
+                # 整份輸出壞掉 (非 JSON / 沒有任務)，模型有回應，不需要退避
+                last_error = parse_feedback = str(parse_error)
+                logger.warning("🔁 Task parse invalid (attempt %d): %s", attempt, last_error)
                 continue
             except Exception as e:
                 last_error = f"Gemini task extraction error: {e}"
-                print(f"❌ {last_error}")
+                logger.error("❌ %s", last_error)
+                await _backoff(attempt, deadline)
                 continue
 
-            raw_text = response.text or ""
-            print(f"🧠 Gemini task output len={len(raw_text)}")
-            print(f"📥 Gemini task raw: {_preview(raw_text)}")
+            if failures:
+                logger.info("🩹 %d tasks valid, %d invalid; repairing only the invalid ones", len(tasks), len(failures))
+                tasks += await AIService._repair_tasks(
+                    model_name, current_time_str, transcript, failures,
+                    deadline=deadline,
+                    max_attempts=max(MAX_RETRIES - attempt, 1)
+                )
+                if not tasks:
+                    raise HTTPException(status_code=400, detail="Task extraction failed: no task passed validation")
+            return tasks
+
+        raise HTTPException(status_code=400, detail=f"Task extraction failed after {MAX_RETRIES} attempts: {last_error}")
+
+    @staticmethod
+    async def _gemini_generate_tasks(
+        model_name: str,
+        user_text: str,
+        timeout: float
+    ) -> str:
+        config = await AIService._gemini_tasks_config(model_name)
+        try:
+            response = await asyncio.wait_for(
+                client.aio.models.generate_content(
+                    model=model_name,
+                    contents=[types.Part.from_text(text=user_text)],
+                    config=config
+                ),
+                timeout=timeout
+            )
+        except genai_errors.ClientError as e:
+            if not _is_context_cache_error(e, config):
+                raise
+            # context cache 已被刪除或過期：丟掉並以內嵌 prompt 重送一次
+            gemini_context_cache.invalidate(model_name, config.cached_content)
+            response = await asyncio.wait_for(
+                client.aio.models.generate_content(
+                    model=model_name,
+                    contents=[types.Part.from_text(text=user_text)],
+                    config=AIService._tasks_config(None)
+                ),
+                timeout=timeout
+            )
+        raw_text = response.text or ""
+        logger.info("🧠 Gemini task output len=%d", len(raw_text))
+        logger.debug("📥 Gemini task raw: %s", Lazy(_preview, raw_text))
+        return raw_text
+
+    @staticmethod
+    async def _repair_tasks(
+        model_name: str,
+        current_time_str: str,
+        transcript: str,
+        failures: list[tuple[Any, str]],
+        deadline: float,
+        max_attempts: int
+    ) -> list[TaskCreate]:
+        """
+        只把驗證失敗的項目 (附錯誤原因) 送回修正，回傳修好的任務；
+        用完次數或時限仍失敗的項目會被捨棄。
+        """
+        repaired: list[TaskCreate] = []
+        for attempt in range(1, max_attempts + 1):
+            timeout = _attempt_timeout(deadline)
+            if timeout <= 0:
+                break
+
+            logger.info("🩹 Gemini task repair (attempt %d, items=%d)...", attempt, len(failures))
             try:
-                tasks, _ = AIService._parse_ai_output(raw_text)
-                return tasks
-            except (ValueError, ValidationError) as parse_error:
-                last_error = str(parse_error)
-                print(f"🔁 Task parse invalid (attempt {attempt}): {last_error}")
+                raw_text = await AIService._gemini_generate_tasks(
+                    model_name,
+                    AIService._task_user_text(current_time_str, AIService._build_repair_text(transcript, failures)),
+                    timeout
+                )
+                fixed, still_failing = AIService._parse_ai_output(raw_text)
+            except asyncio.TimeoutError:
+                logger.warning("⏱️ Gemini task repair timeout after %.1fs", timeout)
+                await _backoff(attempt, deadline)
+                continue
+            except ValueError as parse_error:
+                logger.warning("🔁 Task repair output invalid (attempt %d): %s", attempt, parse_error)
+                continue
+            except Exception as e:
+                logger.error("❌ Gemini task repair error: %s", e)
+                await _backoff(attempt, deadline)
                 continue
 
+            repaired += fixed
+            failures = still_failing
+            if not failures:
+                return repaired
+
+        logger.warning(
+            "⚠️ Dropping %d tasks that failed validation: %s",
+            len(failures), Lazy(lambda: _preview(json.dumps(failures, ensure_ascii=False, default=str)))
+        )
+        return repaired
+
+    @staticmethod
+    def _build_repair_text(transcript: str, failures: list[tuple[Any, str]]) -> str:
+        invalid_items = [{"item": item, "error": error} for item, error in failures]
+        return (
+            f"{transcript}\n\n"
+            "以下任務項目未通過驗證。請依照規則只修正這些項目，"
+            "以相同格式回傳 tasks (一個輸入項目對應一個輸出項目，不要加入其他任務)：\n"
+            f"{json.dumps(invalid_items, ensure_ascii=False)}"
+        )
+
+    @staticmethod
+    async def _gemini_stream_tasks(
+        model_name: str,
+        transcript: str,
+        current_time_str: str
+    ) -> AsyncIterator[TaskCreate]:
+        """
+        串流抽取任務：邊收 Gemini 的 JSON 邊解析，tasks 陣列中每個物件一完整就驗證並送出。
+        不合格的項目先收起來，串流結束後再送回修正；
+        還沒送出任何任務前失敗才重試 (已送出的任務無法收回)。
+        """
+        deadline = _budget_deadline()
+        last_error: str | None = None
+        parse_feedback: str | None = None
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            timeout = _attempt_timeout(deadline)
+            if timeout <= 0:
+                last_error = f"extraction budget of {settings.GEMINI_EXTRACT_BUDGET_SEC}s exhausted ({last_error})"
+                break
+
+            # 只有輸出格式錯誤才回饋給模型，連線/逾時錯誤原樣重送
+            body = transcript if not parse_feedback else f"{transcript}\n先前錯誤：{parse_feedback}"
+            user_text = AIService._task_user_text(current_time_str, body)
+            logger.info("🚀 Gemini streaming task extraction (attempt %d)...", attempt)
+            emitted = 0
+            failures: list[tuple[Any, str]] = []
+            stream = None
+            transient = False
+            config = await AIService._gemini_tasks_config(model_name)
+            try:
+                stream = await asyncio.wait_for(
+                    client.aio.models.generate_content_stream(
+                        model=model_name,
+                        contents=[types.Part.from_text(text=user_text)],
+                        config=config
+                    ),
+                    timeout=timeout
+                )
+                parser = JsonArrayItemStream()
+                while True:
+                    # 以「兩個 chunk 之間」計時，長清單只要持續有輸出就不會逾時
+                    try:
+                        chunk = await asyncio.wait_for(anext(stream), timeout=_attempt_timeout(deadline))
+                    except StopAsyncIteration:
+                        break
+                    valid, invalid = AIService._validate_task_items(parser.feed(chunk.text or ""))
+                    failures += invalid
+                    for task in valid:
+                        emitted += 1
+                        yield task
+                parser.close()
+                if not emitted and not failures:
+                    raise ValueError("AI output is empty or missing task list")
+
+                if failures:
+                    logger.info("🩹 %d tasks streamed, %d invalid; repairing only the invalid ones", emitted, len(failures))
+                    repaired = await AIService._repair_tasks(
+                        model_name, current_time_str, transcript, failures,
+                        deadline=deadline,
+                        max_attempts=max(MAX_RETRIES - attempt, 1)
+                    )
+                    for task in repaired:
+                        emitted += 1
+                        yield task
+                    if not emitted:
+                        raise HTTPException(status_code=400, detail="Task extraction failed: no task passed validation")
+                return
+            except asyncio.TimeoutError:
+                last_error = f"Gemini task extraction timeout after {timeout:.1f}s"
+                logger.warning("⏱️ %s", last_error)
+                transient = True
+            except ValueError as parse_error:
+                last_error = parse_feedback = str(parse_error)
+                logger.warning("🔁 Task stream invalid (attempt %d): %s", attempt, last_error)
+            except HTTPException:
+                raise
+            except Exception as e:
+                last_error = f"Gemini task extraction error: {e}"
+                logger.error("❌ %s", last_error)
+                if _is_context_cache_error(e, config):
+                    # context cache 失效，下一次嘗試會重建或改用內嵌 prompt
+                    gemini_context_cache.invalidate(model_name, config.cached_content)
+                transient = True
+            finally:
+                if stream is not None:
+                    await stream.aclose()
+
+            if emitted:
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Task extraction stream broke after {emitted} tasks: {last_error}"
+                )
+            if transient:
+                await _backoff(attempt, deadline)
+
         raise HTTPException(status_code=400, detail=f"Task extraction failed after {MAX_RETRIES} attempts: {last_error}")
 
     @staticmethod
@@ -280,10 +819,14 @@ class AIService:
         return cleaned
 
     @staticmethod
-    def _build_prompt(current_time_str: str) -> str:
+    @functools.cache
+    def _build_prompt() -> str:
+        """
+        固定的 system prompt (只建一次；當前時間放在 user content，讓 prompt 可被 Gemini 快取)
+        """
         return f"""
         你是一個高科技戰略控制台 'EntroPy' 的後勤官。
-        當前時間: {current_time_str} ({settings.TZ})。
+        當前時間在使用者訊息的第一行 ({settings.TZ})。
 
         【任務目標】
         聆聽使用者的語音指令，將其轉化為符合「抗熵數學模型」的原子任務。
@@ -354,6 +897,40 @@ class AIService:
         """
 
     @staticmethod
+    def _task_user_text(current_time_str: str, body: str) -> str:
+        return f"當前時間: {current_time_str} ({settings.TZ})\n\n{body}"
+
+    @staticmethod
+    async def _gemini_tasks_config(model_name: str) -> types.GenerateContentConfig:
+        cached_content = await gemini_context_cache.get(client, model_name, AIService._build_prompt())
+        return AIService._tasks_config(cached_content)
+
+    @staticmethod
+    @functools.cache
+    def _tasks_config(cached_content: str | None) -> types.GenerateContentConfig:
+        """
+        cached_content 有值時 system prompt 由 context cache 提供 (兩者不能同時指定)
+        """
+        return types.GenerateContentConfig(
+            system_instruction=None if cached_content else AIService._build_prompt(),
+            cached_content=cached_content,
+            response_mime_type="application/json",
+            response_schema=AIService._tasks_response_schema(),
+            temperature=0
+        )
+
+    @staticmethod
+    @functools.cache
+    def _transcript_config() -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction="你是語音校正專家，只輸出校正後的 transcript JSON 物件，禁止編造內容。",
+            response_mime_type="application/json",
+            response_schema=AIService._transcript_schema(),
+            temperature=0
+        )
+
+    @staticmethod
+    @functools.cache
     def _tasks_response_schema() -> types.Schema:
         return types.Schema(
             type=types.Type.OBJECT,
@@ -384,7 +961,10 @@ class AIService:
         )
 
     @staticmethod
-    def _parse_ai_output(raw_text: str) -> tuple[list[TaskCreate], str]:
+    def _parse_ai_output(raw_text: str) -> tuple[list[TaskCreate], list[tuple[Any, str]]]:
+        """
+        回傳 (合格任務, [(不合格項目, 錯誤原因)])；整份不是 JSON 或沒有任務時拋 ValueError
+        """
         try:
             parsed_json: Any = json.loads(raw_text)
         except json.JSONDecodeError as e:
@@ -394,10 +974,28 @@ class AIService:
         if not tasks_payload:
             raise ValueError("AI output is empty or missing task list")
 
-        tasks = [TaskCreate(**item) for item in tasks_payload]
-        return tasks, ""
+        return AIService._validate_task_items(tasks_payload)
 
     @staticmethod
+    def _validate_task_items(items: list[Any]) -> tuple[list[TaskCreate], list[tuple[Any, str]]]:
+        tasks: list[TaskCreate] = []
+        failures: list[tuple[Any, str]] = []
+        for item in items:
+            if not isinstance(item, dict):
+                failures.append((item, "task must be a JSON object"))
+                continue
+            try:
+                tasks.append(TaskCreate(**item))
+            except ValidationError as e:
+                errors = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                    for err in e.errors(include_url=False)
+                )
+                failures.append((item, errors))
+        return tasks, failures
+
+    @staticmethod
+    @functools.cache
     def _transcript_schema() -> types.Schema:
         return types.Schema(
             type=types.Type.OBJECT,
@@ -411,115 +1009,67 @@ class AIService:
         )
 
     @staticmethod
-    def _guess_suffix(filename: str, mime_type: str) -> str:
-        lower = filename.lower()
-        if lower.endswith(".wav"):
-            return ".wav"
-        if lower.endswith(".mp3"):
-            return ".mp3"
-        if lower.endswith(".m4a"):
-            return ".m4a"
-        if lower.endswith(".ogg"):
-            return ".ogg"
-        if lower.endswith(".flac"):
-            return ".flac"
-        if "wav" in mime_type:
-            return ".wav"
-        if "mp3" in mime_type:
-            return ".mp3"
-        if "m4a" in mime_type:
-            return ".m4a"
-        if "ogg" in mime_type:
-            return ".ogg"
-        return ".webm"
-
-    @staticmethod
-    async def _probe_audio(file_content: bytes, suffix: str) -> dict:
-        """
-        使用 ffprobe 驗證音軌與時長，避免空檔/壞檔。
-        """
-        def _call():
-            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-                f.write(file_content)
-                input_path = f.name
-            cmd = [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_format",
-                "-show_streams",
-                "-of",
-                "json",
-                input_path,
-            ]
-            try:
-                out = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
-                return json.loads(out)
-            finally:
-                try:
-                    subprocess.run(["rm", "-f", input_path], check=False)
-                except Exception:
-                    pass
-
+    async def _transcode_audio(upload: AudioSpool, original_mime: str) -> tuple[AudioSpool, str, float | None]:
+        """
+        單一 ffmpeg 同時驗證音軌並轉為 16k mono wav (讀上傳暫存檔、寫 wav 暫存檔)。
+        回傳 (音訊暫存檔, mime, 時長秒數)；ffmpeg 無法處理時沿用上傳原檔，時長為 None (信任上傳)。
+        """
+        wav = AudioSpool.create(suffix=".wav")
+        # 輸入必須是可 seek 的檔案路徑，不能改用 stdin (pipe:0)：
+        # MP4 / M4A 的 moov atom 常在檔尾，ffmpeg 讀 pipe 時無法回頭解析
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-y",
+            "-i",
+            upload.path,
+            "-vn",
+            "-ac",
+            str(WAV_CHANNELS),
+            "-ar",
+            str(WAV_SAMPLE_RATE),
+            "-acodec",
+            "pcm_s16le",
+            "-map_metadata",
+            "-1",
+            wav.path,
+        ]
         try:
-            return await asyncio.to_thread(_call)
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
         except FileNotFoundError:
-            print("⚠️ ffprobe not found; skipping probe and trusting upload.")
-            return {"format": {"duration": 1}, "streams": [{"codec_type": "audio", "duration": 1}]}
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️ ffprobe failed, skipping probe and trusting upload. error={e.output.decode(errors='ignore')}")
-            return {"format": {"duration": 1}, "streams": [{"codec_type": "audio", "duration": 1}]}
-        except Exception as e:
-            print(f"⚠️ ffprobe error, skipping probe and trusting upload. error={e}")
-            return {"format": {"duration": 1}, "streams": [{"codec_type": "audio", "duration": 1}]}
-
-    @staticmethod
-    async def _convert_to_wav(file_content: bytes, source_suffix: str, original_mime: str) -> tuple[bytes, str]:
-        """
-        將輸入音訊轉為 16k mono wav，提升 ASR 穩定度。
-        """
-        def _call():
-            with tempfile.NamedTemporaryFile(suffix=source_suffix, delete=False) as src:
-                src.write(file_content)
-                src_path = src.name
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as dst:
-                dst_path = dst.name
-
-            cmd = [
-                "ffmpeg",
-                "-y",
-                "-i",
-                src_path,
-                "-ac",
-                "1",
-                "-ar",
-                "16000",
-                dst_path,
-            ]
-            try:
-                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-                with open(dst_path, "rb") as f:
-                    return f.read()
-            finally:
-                for path in (src_path, dst_path):
-                    try:
-                        subprocess.run(["rm", "-f", path], check=False)
-                    except Exception:
-                        pass
+            wav.close()
+            logger.warning("⚠️ ffmpeg not found; skipping probe and using original audio bytes.")
+            return upload, original_mime, None
 
         try:
-            wav_bytes = await asyncio.to_thread(_call)
-            print(f"🎛️ Converted audio to wav: {len(wav_bytes)} bytes")
-            return wav_bytes, "audio/wav"
-        except FileNotFoundError:
-            print("⚠️ ffmpeg not found; using original audio bytes.")
-            return file_content, original_mime
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️ ffmpeg conversion failed, using original audio bytes. error={e.stderr.decode(errors='ignore')}")
-            return file_content, original_mime
-        except Exception as e:
-            print(f"⚠️ ffmpeg conversion error, using original audio bytes. error={e}")
-            return file_content, original_mime
+            _, stderr = await proc.communicate()
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+
+        ffmpeg_log = stderr.decode(errors="ignore")
+        if proc.returncode != 0:
+            wav.close()
+            # 能解析容器但沒有音軌 -> 壞檔；其他錯誤 (格式不支援等) 則信任上傳
+            if "Input #0" in ffmpeg_log and "Audio:" not in ffmpeg_log:
+                logger.warning("⛔ No audio stream in upload. ffmpeg=%s", Lazy(_preview, ffmpeg_log))
+                raise HTTPException(status_code=400, detail="Invalid audio stream or too short (no audio track)")
+            logger.warning("⚠️ ffmpeg failed, using original audio bytes. error=%s", Lazy(_preview, ffmpeg_log))
+            return upload, original_mime, None
+
+        # ffmpeg 寫入的是另一個 file descriptor，這裡重新讀 header 取得長度
+        wav.file.seek(0, 2)
+        wav.size = wav.file.tell()
+        wav.file.seek(0)
+        with wave.open(wav.file, "rb") as reader:
+            duration = reader.getnframes() / reader.getframerate()
+        logger.info("🎛️ Converted audio to wav: %d bytes, duration=%.2fs", wav.size, duration)
+        return wav, "audio/wav", duration
 
     @staticmethod
     def _extract_task_list(data: Any):
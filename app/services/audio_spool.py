@@ -0,0 +1,115 @@
+# app/services/audio_spool.py
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import wave
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class AudioSpool:
+    """
+    落地在單一暫存檔的音訊 (上傳原檔或 ffmpeg 轉出的 wav)
+
+    - ffmpeg 直接讀寫檔案路徑、Groq 以檔案串流上傳，不在記憶體保留多份完整副本
+    - 關閉後暫存檔自動刪除 (keep=True 時保留，給背景 job 之後再開啟)
+    """
+
+    def __init__(self, file: BinaryIO, size: int = 0, sha256: str | None = None):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+
+    @classmethod
+    def create(cls, suffix: str = "", dir: str | None = None, keep: bool = False) -> "AudioSpool":
+        return cls(tempfile.NamedTemporaryFile(
+            suffix=suffix,
+            dir=dir or settings.AUDIO_SPOOL_DIR,
+            delete=not keep
+        ))
+
+    @classmethod
+    def from_path(cls, path: str, sha256: str | None = None) -> "AudioSpool":
+        """重新開啟 keep=True 留下的檔案 (關閉時不會刪除，由呼叫端負責)"""
+        return cls(open(path, "rb"), size=os.path.getsize(path), sha256=sha256)
+
+    @classmethod
+    async def from_upload(
+        cls,
+        upload: UploadFile,
+        max_bytes: int,
+        dir: str | None = None,
+        keep: bool = False
+    ) -> "AudioSpool":
+        """
+        分塊讀取上傳檔寫入暫存檔，同時計算 sha256，超過 max_bytes 立即中止 (413)
+        """
+        # Starlette 已知大小時先擋，省去讀取
+        if upload.size is not None and upload.size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Audio too large ({upload.size} bytes > {max_bytes} bytes)"
+            )
+
+        spool = cls.create(dir=dir, keep=keep)
+        digest = hashlib.sha256()
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                spool.size += len(chunk)
+                if spool.size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Audio too large (> {max_bytes} bytes)"
+                    )
+                digest.update(chunk)
+                await asyncio.to_thread(spool.file.write, chunk)
+            spool.file.flush()
+        except BaseException:
+            spool.close()
+            if keep:
+                os.remove(spool.path)
+            raise
+
+        spool.sha256 = digest.hexdigest()
+        return spool
+
+    @property
+    def path(self) -> str:
+        return self.file.name
+
+    def open_for_read(self) -> BinaryIO:
+        """從頭讀取 (給 HTTP multipart 串流上傳用)"""
+        self.file.seek(0)
+        return self.file
+
+    def read_bytes(self) -> bytes:
+        """只在上游 API 必須收 bytes 時使用 (例如 Gemini inline audio)"""
+        self.file.seek(0)
+        return self.file.read()
+
+    def read_wav_window(self, start_sec: float, end_sec: float) -> bytes:
+        """從 PCM wav 暫存檔切出 [start_sec, end_sec) 成為獨立的 wav (依 frame 位置直接讀取)"""
+        self.file.seek(0)
+        with wave.open(self.file, "rb") as reader:
+            rate = reader.getframerate()
+            first = min(int(start_sec * rate), reader.getnframes())
+            last = min(int(end_sec * rate), reader.getnframes())
+            reader.setpos(first)
+            frames = reader.readframes(max(last - first, 0))
+            params = reader.getparams()
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as writer:
+            writer.setparams(params)
+            writer.writeframes(frames)
+        return buffer.getvalue()
+
+    def close(self) -> None:
+        self.file.close()
@@ -0,0 +1,59 @@
+# app/services/blackhole_scheduler.py
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import WriteSessionLocal
+from app.services.event_bus import event_bus
+from app.services.game_service import game_service
+
+logger = logging.getLogger(__name__)
+
+
+class BlackholeScheduler:
+    """
+    背景定期執行黑洞扣除 (取代 GET dashboard 時的惰性寫入)
+
+    - 每 interval 秒一條 set-based UPDATE 處理所有 User
+    - dashboard 只讀取並即時計算目前的值；結算任務時才把扣除寫回單一 User
+    - 有 User 被更新時推播 dashboard 給 SSE 訂閱者 (blackhole_days 變了)
+    - interval <= 0 時不啟動
+    """
+
+    def __init__(self, interval_sec: float):
+        self._interval_sec = interval_sec
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is not None or self._interval_sec <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="blackhole-sweep")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def sweep_once(self) -> int:
+        async with WriteSessionLocal() as db:
+            updated = await game_service.sweep_blackhole_decay(db)
+        if updated:
+            event_bus.publish_dashboard()
+        return updated
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                updated = await self.sweep_once()
+                logger.debug("🕳️ Blackhole sweep updated %d user(s)", updated)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 單次失敗 (例如 SQLite 被鎖住) 不影響下一輪
+                logger.exception("❌ Blackhole sweep failed")
+            await asyncio.sleep(self._interval_sec)
+
+
+blackhole_scheduler = BlackholeScheduler(settings.BLACKHOLE_SWEEP_INTERVAL_SEC)
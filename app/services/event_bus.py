@@ -0,0 +1,195 @@
+# app/services/event_bus.py
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.task import Task
+from app.schemas.dashboard import DashboardResponse
+from app.schemas.task import TaskResponse
+from app.services.game_service import game_service
+from app.utils.sse import format_sse, format_sse_comment
+
+logger = logging.getLogger(__name__)
+
+# 沒有新事件時多久送一次 keep-alive
+SSE_KEEPALIVE_SEC = 15
+# 訂閱者佇列滿了 (client 讀太慢) 時改送這個事件，請 client 重新抓 GET /tasks
+RESYNC_EVENT = "resync"
+
+
+def dashboard_diff(old: dict, new: dict) -> dict:
+    """
+    只保留有變動的欄位 (dict 逐層比較，list / 數值整個替換)
+    """
+    diff = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = dashboard_diff(previous, value)
+            if nested:
+                diff[key] = nested
+        elif value != previous:
+            diff[key] = value
+    return diff
+
+
+class EventBus:
+    """
+    行程內 pub/sub：任務 / dashboard 變動推播給 GET /events 的 SSE 訂閱者
+
+    - publish_*() 只記下變動 (同一任務多次變動只留最後一次)，不阻塞寫入路徑
+    - dispatcher 每 EVENTS_MIN_INTERVAL_SEC 最多送出一批：tasks (changed / deleted) + dashboard diff
+    - dashboard 每批只重算一次，所有訂閱者共用同一個基準 snapshot；沒有寫入時每 DASHBOARD_MAX_STALENESS_SEC 也會重算 (days_left 隨時間變化)
+    - 沒有訂閱者時 publish 直接略過
+    - 關閉時 uvicorn 要等連線結束才跑 lifespan shutdown：仍開著的串流由 --timeout-graceful-shutdown 逾時取消 (見 entrypoint.sh)
+    """
+
+    def __init__(self, min_interval_sec: float, buffer_size: int):
+        self._min_interval_sec = min_interval_sec
+        self._buffer_size = buffer_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._pending_tasks: dict[int, dict | None] = {}
+        self._dashboard_dirty = False
+        self._dirty = asyncio.Event()
+        self._dashboard: dict | None = None
+        self._dashboard_lock = asyncio.Lock()
+        self._dispatcher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._run(), name="event-bus-dispatcher")
+
+    async def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        self._close_streams()
+
+    def publish_task(self, task: Task) -> None:
+        """任務新增 / 修改 / 完成 (commit 之後呼叫)"""
+        if not self._subscribers:
+            return
+        self._pending_tasks[task.id] = TaskResponse.model_validate(task).model_dump(mode="json")
+        self.publish_dashboard()
+
+    def publish_task_deleted(self, task_id: int) -> None:
+        if not self._subscribers:
+            return
+        self._pending_tasks[task_id] = None
+        self.publish_dashboard()
+
+    def publish_dashboard(self) -> None:
+        """User 或壓力來源變動，下一批重算 dashboard"""
+        if not self._subscribers:
+            return
+        self._dashboard_dirty = True
+        self._dirty.set()
+
+    async def stream(self) -> AsyncIterator[str]:
+        """
+        SSE：先送 snapshot (完整 dashboard)，之後送 tasks / dashboard (diff)
+        """
+        # 先訂閱再取 snapshot，之後的 diff 都以這個 snapshot 為基準
+        queue = self._subscribe()
+        try:
+            yield format_sse({"dashboard": await self._current_dashboard()}, event="snapshot")
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SEC)
+                except TimeoutError:
+                    yield format_sse_comment()
+                    continue
+                if message is None:
+                    return
+                event, data = message
+                if event == RESYNC_EVENT:
+                    data = {"dashboard": await self._current_dashboard()}
+                yield format_sse(data, event=event)
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                # 沒人訂閱時不再追蹤變動，基準 snapshot 作廢，下一個訂閱者重新計算
+                self._dashboard = None
+
+    def _close_streams(self) -> None:
+        for queue in self._subscribers:
+            self._put(queue, None)
+
+    def _subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._buffer_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def _put(self, queue: asyncio.Queue, message: tuple[str, Any] | None) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # client 跟不上：丟掉累積的事件，改請它重新同步
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait((RESYNC_EVENT, None) if message is not None else None)
+
+    async def _current_dashboard(self) -> dict:
+        async with self._dashboard_lock:
+            if self._dashboard is None:
+                self._dashboard = await self._load_dashboard()
+            return self._dashboard
+
+    async def _load_dashboard(self) -> dict:
+        async with AsyncSessionLocal() as db:
+            state = await game_service.calculate_state(db, user_id=1)
+        return DashboardResponse.model_validate(state).model_dump(mode="json")
+
+    async def _run(self) -> None:
+        last_flush = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=settings.DASHBOARD_MAX_STALENESS_SEC)
+            except TimeoutError:
+                # 沒有寫入：只為了時間相依欄位重算
+                if not self._subscribers:
+                    continue
+                self._dashboard_dirty = True
+
+            # 限速：距離上一批不到 min interval 就先等，期間的變動併入同一批
+            wait = last_flush + self._min_interval_sec - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._dirty.clear()
+            last_flush = time.monotonic()
+            try:
+                await self._flush()
+            except Exception:
+                logger.exception("❌ Event bus flush failed")
+
+    async def _flush(self) -> None:
+        pending, self._pending_tasks = self._pending_tasks, {}
+        dashboard_dirty, self._dashboard_dirty = self._dashboard_dirty, False
+        if not self._subscribers:
+            return
+
+        messages = []
+        if pending:
+            messages.append(("tasks", {
+                "changed": [task for task in pending.values() if task is not None],
+                "deleted": [task_id for task_id, task in pending.items() if task is None],
+            }))
+        if dashboard_dirty:
+            async with self._dashboard_lock:
+                previous = self._dashboard
+                self._dashboard = current = await self._load_dashboard()
+            diff = dashboard_diff(previous or {}, current)
+            if diff:
+                messages.append(("dashboard", diff))
+
+        for queue in list(self._subscribers):
+            for message in messages:
+                self._put(queue, message)
+
+
+event_bus = EventBus(settings.EVENTS_MIN_INTERVAL_SEC, settings.EVENTS_SUBSCRIBER_BUFFER)
@@ -1,129 +1,228 @@
 # app/services/game_service.py
-import math
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from app.models.task import Task, TaskType, TaskStatus
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+import numpy as np
+from sqlalchemy import DateTime, case, func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task, TaskType
 from app.models.user import User
+from app.services.response_cache import data_version
+from app.services.stress_service import (
+    INACTIVE_STATUSES,
+    StressAggregate,
+    classify_integrity,
+    stress_aggregate,
+)
 
+# 排程扣除時略過最近才更新過的 User (避免頻繁寫入)
+BLACKHOLE_DECAY_MIN_SEC = 60
 
-# app/services/game_service.py
-# ... imports 保持不變 ...
 
 class GameService:
 
     @staticmethod
-    def calculate_state(db: Session, user_id: int = 1):
-        # 1. 獲取 User (若無則建立)
-        user = db.query(User).filter(User.id == user_id).first()
-        now = datetime.now(timezone.utc)
-
-        if not user:
-            user = User(
-                id=user_id,
-                username="Commander",
-                level=1.0,
-                current_xp=0,
-                blackhole_days=7.0,
-                last_blackhole_update=now  # 初始化時間
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-        # 👇 === ⏳ 新增：惰性計算黑洞扣除 ===
-        # 確保 last_blackhole_update 有時區資訊
-        last_update = user.last_blackhole_update.replace(tzinfo=timezone.utc) if user.last_blackhole_update.tzinfo is None else user.last_blackhole_update
-
-        delta_seconds = (now - last_update).total_seconds()
-
-        # 只有經過 60 秒以上才更新，避免頻繁寫入
-        if delta_seconds > 60:
-            days_elapsed = delta_seconds / 86400.0  # 換算成天
-            user.blackhole_days -= days_elapsed
-
-            if user.blackhole_days < 0:
-                user.blackhole_days = 0.0
+    async def calculate_state(db: AsyncSession, user_id: int = 1):
+        return (await GameService.calculate_states(db, [user_id]))[user_id]
 
-            # 更新時間戳記
-            user.last_blackhole_update = now
-            db.add(user)
-            db.commit()
-            # 記憶體中的 user 也已經被更新了
-        # 👆 === 結束 ===
-
-        # 2. 獲取 active tasks (後面邏輯保持不變...)
-        active_school_tasks = db.query(Task).filter(
-            # ... (複製你原本的程式碼)
-            Task.type == TaskType.SCHOOL,
-            Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.INCINERATED])
-        ).all()
-
-        total_stress = 0.0
+    @staticmethod
+    async def calculate_states(db: AsyncSession, user_ids: Iterable[int]) -> dict[int, dict]:
+        """
+        批次計算多個 User 的戰略狀態 (夜間報表 / 黑洞巡檢用)
+        任務壓力只做一次向量化計算，再套用到每個 User 身上
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+
+        # 1. 獲取 Users (唯讀：不存在的 User 以預設值計算，不寫入；預設 User 於啟動時建立)
         now = datetime.now(timezone.utc)
+        result = await db.execute(select(User).where(User.id.in_(user_ids)))
+        users = {user.id: user for user in result.scalars()}
+        for user_id in user_ids:
+            if user_id not in users:
+                users[user_id] = User(**GameService._default_user_values(user_id, now))
+
+        # 2. 取得 active School 任務的壓力聚合 (只在第一次使用時掃描 DB)
+        aggregate = stress_aggregate
+        if not aggregate.loaded:
+            aggregate = await GameService._load_stress_aggregate(db)
+
+        # 3. 只重算隨時間衰減的部分 (days_left)，一次向量化算完
+        now = datetime.now(timezone.utc)
+        total_stress, stress_breakdown = aggregate.compute(now)
 
-        # 用於回傳給前端畫圖的詳細數據
-        stress_breakdown = []
+        # 4. 計算 HP (Integrity)，HP 不能小於 0
+        # 任務目前沒有 user_id，所有 User 共用同一份壓力
+        integrity = np.maximum(100.0 - np.full(len(user_ids), total_stress), 0.0)
 
-        # 3. 逐一計算壓力權重
-        for task in active_school_tasks:
-            # 計算剩餘天數 (Days Until Due)
-            if task.deadline:
-                # 確保 deadline 是 timezone-aware
-                deadline = task.deadline.replace(tzinfo=timezone.utc) if task.deadline.tzinfo is None else task.deadline
-                delta = (deadline - now).total_seconds() / 86400  # 換算成天
-                days_left = max(delta, 0.001)  # 避免 days_left <= -1 導致 log 錯誤
-            else:
-                days_left = 7.0  # 若沒死線，預設給 7 天緩衝
+        # 5. 判定狀態與倍率
+        statuses, multipliers = classify_integrity(integrity)
+
+        states = {}
+        for index, user_id in enumerate(user_ids):
+            user = users[user_id]
+            states[user_id] = {
+                "user_info": {
+                    "level": user.level,
+                    "current_xp": user.current_xp,
+                    # 讀取路徑不寫回：依上次扣除時間即時算出目前剩餘天數 (實際扣除交給排程)
+                    "blackhole_days": GameService.effective_blackhole_days(user, now)
+                },
+                "integrity": round(float(integrity[index]), 1),
+                "total_stress": round(total_stress, 1),
+                "multiplier": float(multipliers[index]),
+                "status": str(statuses[index]),
+                "stress_breakdown": stress_breakdown
+            }
+        return states
 
-            # 核心公式：W_stress = Difficulty / ln(Days + 1)
-            # 使用 math.log (自然對數 ln)
-            # 加 1 是為了避免 days_left 接近 0 時分母為負
-            denominator = math.log(days_left + 1)
+    @staticmethod
+    async def ensure_user(db: AsyncSession, user_id: int = 1) -> bool:
+        """
+        User 不存在時以預設值建立 (INSERT ... ON CONFLICT DO NOTHING，並行呼叫不會衝突)，不 commit
+        回傳是否新建立
+        """
+        dialect = db.bind.dialect.name
+        if dialect == "sqlite":
+            insert = sqlite.insert
+        elif dialect == "postgresql":
+            insert = postgresql.insert
+        else:
+            raise ValueError(f"Creating users does not support database dialect '{dialect}'")
+        values = GameService._default_user_values(user_id, datetime.now(timezone.utc))
+        result = await db.execute(insert(User).values(**values).on_conflict_do_nothing(index_elements=[User.id]))
+        return bool(result.rowcount)
 
-            # 保護機制：避免分母過小導致無限大
-            if denominator < 0.1:
-                denominator = 0.1
+    @staticmethod
+    def _default_user_values(user_id: int, now: datetime) -> dict:
+        naive_now = now.replace(tzinfo=None)  # naive UTC
+        return {
+            "id": user_id,
+            "username": "Commander",
+            "level": 1.0,
+            "current_xp": 0,
+            "blackhole_days": 7.0,
+            "last_blackhole_update": naive_now,
+            "last_login": naive_now,
+        }
 
-            task_stress = task.difficulty / denominator
+    @staticmethod
+    def effective_blackhole_days(user: User, now: datetime) -> float:
+        """
+        依經過時間算出目前的黑洞天數 (不修改 user)
+        """
+        # 確保 last_blackhole_update 有時區資訊
+        last_update = user.last_blackhole_update.replace(tzinfo=timezone.utc) if user.last_blackhole_update.tzinfo is None else user.last_blackhole_update
 
-            # 限制單一任務最大壓力 (例如 40%)，避免一個任務就讓系統崩潰
-            task_stress = min(task_stress, 40.0)
+        days_elapsed = (now - last_update).total_seconds() / 86400.0  # 換算成天
+        return max(user.blackhole_days - max(days_elapsed, 0.0), 0.0)
 
-            total_stress += task_stress
+    @staticmethod
+    async def sweep_blackhole_decay(db: AsyncSession) -> int:
+        """
+        所有 User 的黑洞扣除一次用一條 UPDATE 完成 (背景排程呼叫)，回傳更新的列數
+        經過天數在資料庫端計算，不需要先把 users 讀回來
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # naive UTC
+        result = await db.execute(
+            update(User)
+            .where(User.last_blackhole_update < now - timedelta(seconds=BLACKHOLE_DECAY_MIN_SEC))
+            .values(
+                blackhole_days=GameService._decayed_blackhole_days(db.bind.dialect.name, now),
+                last_blackhole_update=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount:
+            data_version.bump()
+        return result.rowcount
+
+    @staticmethod
+    async def current_multiplier(db: AsyncSession) -> float:
+        """
+        只取目前的 XP 倍率 (結算用)：使用常駐的壓力聚合，不查 users、不寫入
+        """
+        aggregate = stress_aggregate
+        if not aggregate.loaded:
+            aggregate = await GameService._load_stress_aggregate(db)
+        total_stress = aggregate.total_stress(datetime.now(timezone.utc))
+        _, multipliers = classify_integrity(np.array([max(100.0 - total_stress, 0.0)]))
+        return float(multipliers[0])
 
-            stress_breakdown.append({
-                "task_title": task.title,
-                "days_left": round(days_left, 1),
-                "stress_impact": round(task_stress, 1)
-            })
+    @staticmethod
+    async def grant_rewards(
+        db: AsyncSession,
+        user_id: int,
+        xp: int,
+        blackhole_days: float,
+        update_level: bool = False
+    ) -> None:
+        """
+        以相對 UPDATE 發放獎勵 (不先讀 user，並行結算不會互相覆蓋)，不 commit，由呼叫端控制交易
+        - 同時把尚未扣除的黑洞天數寫回，獎勵加在目前的值上
+        - update_level：依新的 XP 重算等級 (每 1000 XP 升一級，只有 Skill 結算會重算)
+        """
+        # User 不存在時先建立 (ON CONFLICT DO NOTHING)，之後一律走相對 UPDATE
+        await GameService.ensure_user(db, user_id)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # naive UTC
+        values = {
+            "blackhole_days": GameService._decayed_blackhole_days(db.bind.dialect.name, now) + blackhole_days,
+            "last_blackhole_update": now,
+            "current_xp": User.current_xp + xp,
+            "last_login": now,
+        }
+        if update_level:
+            values["level"] = 1.0 + (User.current_xp + xp) / 1000.0
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
 
-        # 4. 計算 HP (Integrity)
-        current_hp = 100.0 - total_stress
-        current_hp = max(0.0, current_hp)  # HP 不能小於 0
+    @staticmethod
+    def _decayed_blackhole_days(dialect: str, now: datetime):
+        """
+        扣除經過天數後的黑洞天數 (不小於 0) 的 SQL 表達式
+        """
+        remaining = User.blackhole_days - GameService._days_since(dialect, now, User.last_blackhole_update)
+        return case((remaining > 0, remaining), else_=0.0)
 
-        # 5. 判定狀態與倍率
-        if current_hp >= 80:
-            status = "FLOW"
-            multiplier = 1.2
-        elif current_hp >= 50:
-            status = "NORMAL"
-            multiplier = 1.0
-        else:
-            status = "BRAIN_FOG"
-            multiplier = 0.5
+    @staticmethod
+    def _days_since(dialect: str, now: datetime, column):
+        """
+        各資料庫計算「now - column」天數的 SQL 表達式
+        """
+        now_param = literal(now, DateTime())
+        if dialect == "sqlite":
+            return func.julianday(now_param) - func.julianday(column)
+        if dialect == "postgresql":
+            return func.extract("epoch", now_param - column) / 86400.0
+        raise ValueError(f"Blackhole decay does not support database dialect '{dialect}'")
 
-        return {
-            "user_info": {
-                "level": user.level,
-                "current_xp": user.current_xp,
-                "blackhole_days": user.blackhole_days
-            },
-            "integrity": round(current_hp, 1),
-            "total_stress": round(total_stress, 1),
-            "multiplier": multiplier,
-            "status": status,
-            "stress_breakdown": stress_breakdown
-        }
+    @staticmethod
+    async def _load_stress_aggregate(db: AsyncSession) -> StressAggregate:
+        """
+        以欄式查詢掃描一次 active School 任務，建立常駐的壓力聚合
+        """
+        generation = stress_aggregate.begin_load()
+        result = await db.execute(
+            select(Task.id, Task.title, Task.difficulty, Task.deadline).where(
+                Task.type == TaskType.SCHOOL,
+                Task.status.notin_(INACTIVE_STATUSES)
+            )
+        )
+        rows = result.all()
+        if stress_aggregate.load(rows, generation):
+            return stress_aggregate
+
+        # 載入期間有任務異動：這次只用剛查到的資料計算，下次 request 再重新載入
+        snapshot = StressAggregate()
+        snapshot.load(rows, snapshot.begin_load())
+        return snapshot
 
 
 game_service = GameService()
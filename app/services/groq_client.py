@@ -0,0 +1,66 @@
+# app/services/groq_client.py
+import asyncio
+from typing import BinaryIO
+
+import httpx
+
+from app.core.config import settings
+
+GROQ_TRANSCRIBE_PATH = "/openai/v1/audio/transcriptions"
+GROQ_CONNECT_TIMEOUT_SEC = 10
+GROQ_TIMEOUT_SEC = 90
+
+
+class GroqClient:
+    """
+    長駐的 Groq HTTP client
+
+    - 連線池 + keep-alive (支援時使用 HTTP/2)，轉錄請求重用已建立的 TLS 連線
+    - Semaphore 限制同時進行的上傳數量，不再佔用 threadpool
+    - 由 FastAPI lifespan 在啟動時 start()、關閉時 close()
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_concurrency = max_concurrency
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=settings.GROQ_API_BASE_URL,
+            headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"},
+            http2=settings.GROQ_HTTP2,
+            limits=httpx.Limits(
+                max_connections=self._max_concurrency,
+                max_keepalive_connections=self._max_concurrency,
+            ),
+            timeout=httpx.Timeout(GROQ_TIMEOUT_SEC, connect=GROQ_CONNECT_TIMEOUT_SEC),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def transcribe(self, audio: bytes | BinaryIO, filename: str, mime_type: str, data: dict) -> dict:
+        """
+        上傳音檔 (bytes 或檔案物件，檔案會以串流方式送出) 並回傳 Groq JSON
+        HTTP 錯誤會拋出 httpx.HTTPStatusError
+        """
+        if self._client is None:
+            # 未經 lifespan 啟動 (例如腳本直接呼叫) 時延遲建立
+            await self.start()
+
+        async with self._semaphore:
+            resp = await self._client.post(
+                GROQ_TRANSCRIBE_PATH,
+                files={"file": (filename, audio, mime_type)},
+                data=data,
+            )
+        resp.raise_for_status()
+        return resp.json()
+
+
+groq_client = GroqClient(max_concurrency=settings.GROQ_MAX_CONCURRENCY)
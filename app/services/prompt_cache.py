@@ -0,0 +1,93 @@
+# app/services/prompt_cache.py
+import asyncio
+import logging
+import time
+
+from google import genai
+from google.genai import types
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 到期前多久就換新的 cache (避免請求送出時剛好過期)
+CONTEXT_CACHE_REFRESH_MARGIN_SEC = 60
+# 建立失敗 (例如 prompt 低於模型的最小快取 token 數、模型不支援) 後多久再試
+CONTEXT_CACHE_RETRY_AFTER_SEC = 600
+
+
+class GeminiContextCache:
+    """
+    Gemini explicit context caching：固定的 system prompt 只上傳一次，之後請求以 cached_content 引用
+    - get() 回傳 cache 名稱；未啟用或建立失敗時回傳 None，呼叫端改用一般的 system_instruction
+    - 每個 model 一份，TTL 到期前自動重建；重建後盡量刪掉舊的 cache (不等它自己過期，省儲存費用)
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._failed_until: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, client: genai.Client, model_name: str, system_prompt: str) -> str | None:
+        if not settings.GEMINI_CONTEXT_CACHE_ENABLED:
+            return None
+        name = self._valid_entry(model_name)
+        if name is not None:
+            return name
+        if time.monotonic() < self._failed_until.get(model_name, 0.0):
+            return None
+
+        async with self._lock:
+            # 等鎖期間可能已被其他請求建立
+            name = self._valid_entry(model_name)
+            if name is not None:
+                return name
+            previous = self._entries.get(model_name)
+            ttl = settings.GEMINI_CONTEXT_CACHE_TTL_SEC
+            try:
+                cache = await client.aio.caches.create(
+                    model=model_name,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_prompt,
+                        display_name="entropy-task-extraction",
+                        ttl=f"{ttl}s"
+                    )
+                )
+            except Exception as e:
+                self._failed_until[model_name] = time.monotonic() + CONTEXT_CACHE_RETRY_AFTER_SEC
+                logger.warning("⚠️ Gemini context cache unavailable for %s, sending the prompt inline: %s", model_name, e)
+                return None
+
+            self._entries[model_name] = (cache.name, time.monotonic() + ttl)
+            logger.info("🗄️ Gemini context cache created: %s (model=%s, ttl=%ss)", cache.name, model_name, ttl)
+            if previous is not None:
+                await self._delete(client, previous[0])
+            return cache.name
+
+    def invalidate(self, model_name: str, name: str | None = None) -> None:
+        """
+        cache 被刪除 / 過期 (請求回 4xx) 時呼叫，下一次 get() 重建
+        name：請求使用的 cache；已經換成新的 cache 時不理會 (舊 cache 被刪掉後的遲到錯誤)
+        """
+        entry = self._entries.get(model_name)
+        if entry is not None and (name is None or entry[0] == name):
+            # 保留名稱，重建成功後刪除
+            self._entries[model_name] = (entry[0], 0.0)
+
+    @staticmethod
+    async def _delete(client: genai.Client, name: str) -> None:
+        """盡力刪除舊的 cache，失敗只記 log (最晚 TTL 到期時也會自動清掉)"""
+        try:
+            await client.aio.caches.delete(name=name)
+            logger.info("🧹 Gemini context cache deleted: %s", name)
+        except Exception as e:
+            logger.warning("⚠️ Could not delete old Gemini context cache %s: %s", name, e)
+
+    def _valid_entry(self, model_name: str) -> str | None:
+        entry = self._entries.get(model_name)
+        if entry is None or time.monotonic() >= entry[1] - CONTEXT_CACHE_REFRESH_MARGIN_SEC:
+            return None
+        return entry[0]
+
+
+gemini_context_cache = GeminiContextCache()
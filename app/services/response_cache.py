@@ -0,0 +1,120 @@
+# app/services/response_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+# 回應一律要求 client 每次回來驗證 (帶 If-None-Match)，沒變就回 304
+CACHE_CONTROL = "no-cache"
+
+
+class DataVersion:
+    """
+    tasks / users 的資料版本號：每次寫入 commit 之後 bump，GET 快取以此判斷是否過期
+    只涵蓋本行程的寫入 (前提：單一 API 行程，同 speech job)
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> None:
+        with self._lock:
+            self._value += 1
+
+
+data_version = DataVersion()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    version: int
+    created_at: float
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+
+
+def make_etag(body: bytes) -> str:
+    """strong ETag：回應內容的 hash"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 用 weak comparison (忽略 W/ 前綴)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """
+    GET 回應快取：存已序列化的 JSON bytes + ETag，命中時不查 DB、不跑 Pydantic
+    - key 由呼叫端決定 (路徑 + query)；data_version 變了就失效
+    - max_age_sec：含時間相依欄位的回應最多沿用多久 (None = 只看 data_version)
+    - 關閉快取時仍會計算 ETag 並回 304 (省傳輸量)
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        render: Callable[[], Awaitable[tuple[bytes, dict[str, str]]]],
+        max_age_sec: float | None = None
+    ) -> Response:
+        # 先讀版本再產生內容：產生期間有寫入時，存下的舊版本下次就會失效
+        version = data_version.value
+        entry = self._get(key, version, max_age_sec)
+        if entry is None:
+            body, headers = await render()
+            entry = CachedResponse(version, time.monotonic(), body, make_etag(body), headers)
+            if settings.RESPONSE_CACHE_ENABLED:
+                self._set(key, entry)
+
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def _get(self, key: str, version: int, max_age_sec: float | None) -> CachedResponse | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expired = max_age_sec is not None and time.monotonic() - entry.created_at > max_age_sec
+            if entry.version != version or expired:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return entry
+
+    def _set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
@@ -0,0 +1,189 @@
+# app/services/speech_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+from app.schemas.task import TaskCreate
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    行程內 LRU + TTL 快取
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = (time.time() + self.ttl_sec, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class SQLiteCacheBackend:
+    """
+    落地到 SQLite 檔案的快取 (重啟後仍有效)，值以 JSON 儲存
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_sec: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS speech_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM speech_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM speech_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE speech_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO speech_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now + self.ttl_sec, now)
+            )
+            # 淘汰過期項目，並只保留最近使用的 max_entries 筆 (LRU)
+            conn.execute("DELETE FROM speech_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM speech_cache WHERE key NOT IN ("
+                " SELECT key FROM speech_cache ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+
+class SpeechCache:
+    """
+    語音流程的內容定址快取 (client 重試時不用再付一次 Groq / Gemini)
+
+    - groq:{audio_hash}                         Groq verbose_json 結果
+    - transcript:{audio_hash}:{model}           校正並清理後的 transcript
+    - tasks:{transcript_hash}:{date}:{model}    解析後的 TaskCreate 清單 (相對日期依當天解讀)
+    """
+
+    def __init__(self, backend: MemoryCacheBackend | SQLiteCacheBackend | None):
+        self.backend = backend
+
+    @classmethod
+    def from_settings(cls) -> "SpeechCache":
+        if not settings.SPEECH_CACHE_ENABLED:
+            return cls(None)
+        if settings.SPEECH_CACHE_PATH:
+            backend = SQLiteCacheBackend(
+                settings.SPEECH_CACHE_PATH,
+                max_entries=settings.SPEECH_CACHE_MAX_ENTRIES,
+                ttl_sec=settings.SPEECH_CACHE_TTL_SEC
+            )
+        else:
+            backend = MemoryCacheBackend(
+                max_entries=settings.SPEECH_CACHE_MAX_ENTRIES,
+                ttl_sec=settings.SPEECH_CACHE_TTL_SEC
+            )
+        return cls(backend)
+
+    async def _get(self, key: str) -> Any | None:
+        if self.backend is None:
+            return None
+        try:
+            if isinstance(self.backend, SQLiteCacheBackend):
+                return await asyncio.to_thread(self.backend.get, key)
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning("⚠️ Speech cache read error, ignoring cache. error=%s", e)
+            return None
+
+    async def _set(self, key: str, value: Any) -> None:
+        if self.backend is None:
+            return
+        try:
+            if isinstance(self.backend, SQLiteCacheBackend):
+                await asyncio.to_thread(self.backend.set, key, value)
+            else:
+                self.backend.set(key, value)
+        except Exception as e:
+            logger.warning("⚠️ Speech cache write error, ignoring cache. error=%s", e)
+
+    async def get_groq(self, audio_hash: str) -> dict | None:
+        return await self._get(f"groq:{audio_hash}")
+
+    async def set_groq(self, audio_hash: str, result: dict) -> None:
+        await self._set(f"groq:{audio_hash}", result)
+
+    async def get_transcript(self, audio_hash: str, model_name: str) -> str | None:
+        return await self._get(f"transcript:{audio_hash}:{model_name}")
+
+    async def set_transcript(self, audio_hash: str, model_name: str, transcript: str) -> None:
+        await self._set(f"transcript:{audio_hash}:{model_name}", transcript)
+
+    async def get_tasks(self, transcript: str, date_bucket: str, model_name: str) -> list[TaskCreate] | None:
+        cached = await self._get(f"tasks:{content_hash(transcript)}:{date_bucket}:{model_name}")
+        if cached is None:
+            return None
+        return [TaskCreate(**item) for item in cached]
+
+    async def set_tasks(self, transcript: str, date_bucket: str, model_name: str, tasks: list[TaskCreate]) -> None:
+        await self._set(
+            f"tasks:{content_hash(transcript)}:{date_bucket}:{model_name}",
+            [task.model_dump(mode="json") for task in tasks]
+        )
+
+
+speech_cache = SpeechCache.from_settings()
@@ -0,0 +1,367 @@
+# app/services/speech_job_service.py
+import asyncio
+import logging
+import os
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, WriteSessionLocal
+from app.core.metrics import observe_speech_stage
+from app.models.speech_job import SpeechJob, SpeechJobStatus
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+from app.schemas.speech_job import SpeechJobResponse
+from app.services import task_service
+from app.services.ai_service import ai_service
+from app.services.audio_spool import AudioSpool
+from app.utils.sse import format_sse, format_sse_comment
+from app.utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (SpeechJobStatus.SUCCEEDED, SpeechJobStatus.FAILED)
+# SSE 沒有新事件時多久送一次 keep-alive (同時回資料庫確認狀態)
+SSE_KEEPALIVE_SEC = 15
+
+
+def _to_response(job: SpeechJob, tasks: list[Task]) -> SpeechJobResponse:
+    return SpeechJobResponse(
+        id=job.id,
+        status=job.status,
+        stage=job.stage,
+        timings=job.timings or {},
+        transcript=job.transcript,
+        tasks=tasks,
+        error=job.error,
+        error_status=job.error_status,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
+
+
+def _remove_audio(path: str | None) -> None:
+    if path:
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+
+class SpeechJobManager:
+    """
+    行程內的語音 job 佇列 (狀態存在資料庫，不需要外部 broker)
+
+    - submit(): 音檔落地、寫入 queued 列，放進有上限的佇列 (滿了回 503)
+    - 固定數量的 worker 執行 ai_service 流程，每完成一個階段就寫回資料庫並推播給 SSE 訂閱者
+    - start(): 重新排入上次關機時 queued / running 的 job (前提：單一 API 行程)
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._worker_count = workers
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_pending)
+        self._workers: list[asyncio.Task] = []
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        await self._recover()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"speech-job-worker-{i}")
+            for i in range(self._worker_count)
+        ]
+
+    async def stop(self) -> None:
+        # 執行中的 job 保持 running，下次啟動時重新排入
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, db: AsyncSession, file: UploadFile) -> SpeechJob:
+        if self._queue.full():
+            raise HTTPException(status_code=503, detail="Speech job queue is full, retry later")
+
+        spool = await AudioSpool.from_upload(
+            file,
+            settings.MAX_AUDIO_UPLOAD_BYTES,
+            dir=settings.SPEECH_JOB_DIR,
+            keep=True
+        )
+        spool.close()
+
+        job = SpeechJob(
+            id=uuid.uuid4().hex,
+            status=SpeechJobStatus.QUEUED,
+            audio_path=spool.path,
+            audio_sha256=spool.sha256,
+            filename=file.filename or "audio.webm",
+            mime_type=file.content_type or "audio/mp3"
+        )
+        db.add(job)
+        await db.commit()
+
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            # 上傳期間佇列被其他請求塞滿
+            await db.delete(job)
+            await db.commit()
+            _remove_audio(spool.path)
+            raise HTTPException(status_code=503, detail="Speech job queue is full, retry later")
+
+        logger.info("📥 Speech job queued: id=%s, bytes=%d, pending=%d", job.id, spool.size, self._queue.qsize())
+        return job
+
+    async def to_response(self, db: AsyncSession, job: SpeechJob) -> SpeechJobResponse:
+        tasks = []
+        if job.task_ids:
+            result = await db.scalars(select(Task).where(Task.id.in_(job.task_ids)).order_by(Task.id))
+            tasks = list(result)
+        return _to_response(job, tasks)
+
+    async def stream_events(self, job_id: str) -> AsyncIterator[str]:
+        """
+        SSE：先送目前狀態 (status)，之後每完成一個階段送 stage，
+        最後送 succeeded / failed (內容同 GET /tasks/speech/jobs/{id}) 並結束
+        """
+        # 先訂閱再讀資料庫，避免錯過兩者之間完成的事件
+        queue = self._subscribe(job_id)
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await db.get(SpeechJob, job_id)
+                if job is None:
+                    return
+                snapshot = await self.to_response(db, job)
+            yield format_sse(snapshot.model_dump(mode="json"), event="status")
+            if job.status in TERMINAL_STATUSES:
+                yield format_sse(snapshot.model_dump(mode="json"), event=job.status.value)
+                return
+
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SEC)
+                except TimeoutError:
+                    # 推播只在同一行程內有效，閒置時回資料庫確認是否已結束
+                    async with AsyncSessionLocal() as db:
+                        job = await db.get(SpeechJob, job_id)
+                        if job is not None and job.status in TERMINAL_STATUSES:
+                            final = await self.to_response(db, job)
+                            yield format_sse(final.model_dump(mode="json"), event=job.status.value)
+                            return
+                    yield format_sse_comment()
+                    continue
+
+                yield format_sse(data, event=event)
+                if event in (SpeechJobStatus.SUCCEEDED.value, SpeechJobStatus.FAILED.value):
+                    return
+        finally:
+            self._unsubscribe(job_id, queue)
+
+    def _subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def _unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def _publish(self, job_id: str, event: str, data: dict) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait((event, data))
+
+    async def _recover(self) -> None:
+        async with WriteSessionLocal() as db:
+            result = await db.scalars(
+                select(SpeechJob)
+                .where(SpeechJob.status.in_([SpeechJobStatus.QUEUED, SpeechJobStatus.RUNNING]))
+                .order_by(SpeechJob.created_at)
+            )
+            jobs = list(result)
+            for job in jobs:
+                if not job.audio_path or not os.path.exists(job.audio_path):
+                    job.status = SpeechJobStatus.FAILED
+                    job.error = "Audio file lost before the job could run"
+                    job.error_status = 500
+                    job.finished_at = datetime.now(timezone.utc)
+                    continue
+                if self._queue.full():
+                    job.status = SpeechJobStatus.FAILED
+                    job.error = "Speech job queue is full"
+                    job.error_status = 503
+                    job.finished_at = datetime.now(timezone.utc)
+                    _remove_audio(job.audio_path)
+                    job.audio_path = None
+                    continue
+                job.status = SpeechJobStatus.QUEUED
+                self._queue.put_nowait(job.id)
+            await db.commit()
+
+        if jobs:
+            logger.info("♻️ Recovered %d unfinished speech jobs", self._queue.qsize())
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("❌ Speech job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        # queued -> running 以條件式 UPDATE 認領，同一個 job 不會被兩個 worker 執行
+        async with WriteSessionLocal() as db:
+            claimed = await db.execute(
+                update(SpeechJob)
+                .where(SpeechJob.id == job_id, SpeechJob.status == SpeechJobStatus.QUEUED)
+                .values(status=SpeechJobStatus.RUNNING)
+            )
+            await db.commit()
+            if claimed.rowcount == 0:
+                return
+            job = await db.get(SpeechJob, job_id)
+        self._publish(job_id, "running", {"id": job_id, "status": SpeechJobStatus.RUNNING.value})
+        logger.info("🏃 Speech job started: id=%s", job_id)
+
+        # 階段完成 -> 佇列 -> recorder 依序寫回資料庫並推播 (StageTimer 的 callback 是同步的)
+        stage_events: asyncio.Queue = asyncio.Queue()
+        recorder = asyncio.create_task(self._record_stages(job_id, stage_events))
+        timer = StageTimer(
+            on_stage=lambda name, seconds: stage_events.put_nowait((name, seconds)),
+            observe=observe_speech_stage
+        )
+
+        try:
+            audio = AudioSpool.from_path(job.audio_path, job.audio_sha256)
+            try:
+                tasks_data, transcript, _ = await ai_service.process_audio_spool(
+                    audio, job.mime_type, job.filename, timer=timer
+                )
+            finally:
+                audio.close()
+        except HTTPException as e:
+            await self._finish(job_id, stage_events, recorder, error=str(e.detail), error_status=e.status_code)
+        except Exception as e:
+            await self._finish(
+                job_id, stage_events, recorder,
+                error=f"Internal error: {type(e).__name__}: {e}", error_status=500
+            )
+        else:
+            await self._finish(
+                job_id, stage_events, recorder,
+                transcript=transcript,
+                tasks_in=tasks_data,
+                timer=timer
+            )
+        finally:
+            # 被取消 (關機) 時不寫結果，job 維持 running 等下次啟動重跑
+            if not recorder.done():
+                stage_events.put_nowait(None)
+                recorder.cancel()
+
+    async def _finish(
+        self,
+        job_id: str,
+        stage_events: asyncio.Queue,
+        recorder: asyncio.Task,
+        *,
+        transcript: str | None = None,
+        tasks_in: list[TaskCreate] | None = None,
+        timer: StageTimer | None = None,
+        error: str | None = None,
+        error_status: int | None = None
+    ) -> None:
+        # 先等所有階段寫完，最終狀態一定是最後一筆更新
+        stage_events.put_nowait(None)
+        await recorder
+
+        tasks: list[Task] = []
+        job = None
+        if error is None:
+            try:
+                job, tasks = await self._save_success(job_id, transcript, tasks_in, timer)
+            except Exception as e:
+                logger.exception("❌ Speech job %s failed to save its tasks", job_id)
+                error, error_status = f"Internal error: {type(e).__name__}: {e}", 500
+        if job is None:
+            async with WriteSessionLocal() as db:
+                job = await db.get(SpeechJob, job_id)
+                audio_path = job.audio_path
+                job.status = SpeechJobStatus.FAILED
+                job.error = error
+                job.error_status = error_status
+                job.audio_path = None
+                job.finished_at = datetime.now(timezone.utc)
+                await db.commit()
+            _remove_audio(audio_path)
+
+        response = _to_response(job, tasks)
+        self._publish(job_id, job.status.value, response.model_dump(mode="json"))
+        if error is None:
+            logger.info("✅ Speech job succeeded: id=%s, tasks=%d", job_id, len(tasks))
+        else:
+            logger.warning("❌ Speech job failed: id=%s, status=%s, error=%s", job_id, error_status, error)
+
+    async def _save_success(
+        self,
+        job_id: str,
+        transcript: str,
+        tasks_in: list[TaskCreate],
+        timer: StageTimer
+    ) -> tuple[SpeechJob, list[Task]]:
+        """
+        任務與 succeeded 狀態寫在同一個交易：中途當機時兩者都沒寫入，重啟後重跑 job 也不會重複建立任務
+        """
+        async with WriteSessionLocal() as db:
+            job = await db.get(SpeechJob, job_id)
+            audio_path = job.audio_path
+            with timer.stage("save"):
+                tasks = await task_service.insert_tasks_bulk(db, tasks_in)
+            job.status = SpeechJobStatus.SUCCEEDED
+            job.stage = "save"
+            job.transcript = transcript
+            job.task_ids = [task.id for task in tasks]
+            job.timings = {**timer.timings, "total": timer.total()}
+            job.audio_path = None
+            job.finished_at = datetime.now(timezone.utc)
+            await db.commit()
+        task_service.tasks_created(tasks)
+        _remove_audio(audio_path)
+        # stage recorder 已結束，save 階段直接推播
+        self._publish(job_id, "stage", {"id": job_id, "stage": "save", "seconds": job.timings["save"]})
+        return job, tasks
+
+    async def _record_stages(self, job_id: str, stage_events: asyncio.Queue) -> None:
+        timings: dict[str, float] = {}
+        while (item := await stage_events.get()) is not None:
+            name, seconds = item
+            timings[name] = seconds
+            try:
+                async with WriteSessionLocal() as db:
+                    await db.execute(
+                        update(SpeechJob)
+                        .where(SpeechJob.id == job_id)
+                        .values(stage=name, timings=dict(timings))
+                    )
+                    await db.commit()
+            except Exception as e:
+                # 進度寫入失敗不影響 job 本身
+                logger.warning("⚠️ Speech job %s stage update failed: %s", job_id, e)
+            self._publish(job_id, "stage", {"id": job_id, "stage": name, "seconds": seconds})
+
+
+speech_job_manager = SpeechJobManager(
+    workers=settings.SPEECH_JOB_WORKERS,
+    max_pending=settings.SPEECH_JOB_MAX_PENDING
+)
@@ -0,0 +1,189 @@
+# app/services/stress_service.py
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+import numpy as np
+
+from app.models.task import TaskStatus, TaskType
+
+# 壓力公式參數 (與 GameService 原本的逐筆迴圈一致)
+NO_DEADLINE_DAYS = 7.0      # 沒死線的任務，預設給 7 天緩衝
+MIN_DAYS_LEFT = 0.001       # 避免 days_left <= -1 導致 log 錯誤
+MIN_DENOMINATOR = 0.1       # 避免分母過小導致無限大
+MAX_TASK_STRESS = 40.0      # 單一任務最大壓力
+
+# HP 分級：(下限, 狀態, 倍率)，由高到低判定
+HP_TIERS = (
+    (80.0, "FLOW", 1.2),
+    (50.0, "NORMAL", 1.0),
+)
+FALLBACK_TIER = ("BRAIN_FOG", 0.5)
+
+INACTIVE_STATUSES = (TaskStatus.COMPLETED, TaskStatus.INCINERATED)
+
+
+def is_stress_source(task_type, task_status) -> bool:
+    """只有尚未完成/焚化的 School 任務會產生壓力"""
+    return task_type == TaskType.SCHOOL and task_status not in INACTIVE_STATUSES
+
+
+def _to_timestamp(deadline: datetime | None) -> float:
+    """deadline 轉 epoch 秒數，沒死線以 NaN 表示"""
+    if deadline is None:
+        return np.nan
+    # 確保 deadline 是 timezone-aware
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline.timestamp()
+
+
+@dataclass(frozen=True)
+class StressColumns:
+    """active School 任務的欄式快照 (依 task id 遞增排序)"""
+    ids: np.ndarray
+    titles: list[str]
+    difficulty: np.ndarray
+    deadline_ts: np.ndarray     # epoch 秒數，NaN = 沒死線
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "StressColumns":
+        rows = sorted(rows, key=lambda row: row[0])
+        count = len(rows)
+        return cls(
+            ids=np.fromiter((row[0] for row in rows), dtype=np.int64, count=count),
+            titles=[row[1] for row in rows],
+            difficulty=np.fromiter((row[2] for row in rows), dtype=np.float64, count=count),
+            deadline_ts=np.fromiter((row[3] for row in rows), dtype=np.float64, count=count),
+        )
+
+
+def compute_stress(columns: StressColumns, now: datetime) -> tuple[np.ndarray, np.ndarray]:
+    """
+    向量化計算每個任務的 (days_left, stress)
+
+    核心公式：W_stress = Difficulty / ln(Days + 1)，並套用分母下限與單一任務上限
+    """
+    delta = (columns.deadline_ts - now.timestamp()) / 86400  # 換算成天
+    days_left = np.where(
+        np.isnan(columns.deadline_ts),
+        NO_DEADLINE_DAYS,
+        np.maximum(delta, MIN_DAYS_LEFT)
+    )
+    denominator = np.maximum(np.log(days_left + 1), MIN_DENOMINATOR)
+    stress = np.minimum(columns.difficulty / denominator, MAX_TASK_STRESS)
+    return days_left, stress
+
+
+def classify_integrity(integrity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    依 HP 判定狀態與倍率 (可一次處理多個 HP 值)
+    """
+    conditions = [integrity >= floor for floor, _, _ in HP_TIERS]
+    statuses = np.select(conditions, [status for _, status, _ in HP_TIERS], default=FALLBACK_TIER[0])
+    multipliers = np.select(conditions, [mult for _, _, mult in HP_TIERS], default=FALLBACK_TIER[1])
+    return statuses, multipliers
+
+
+class StressAggregate:
+    """
+    常駐記憶體的壓力聚合 (只記錄 active School 任務)
+
+    - 第一次使用時從 DB 載入一次，之後由 task 的 create/update/delete/commit 維護
+    - 每次 request 只需要做「隨時間衰減」的部分 (依 deadline 重算 days_left)
+    - 計算時使用 NumPy 欄式陣列，異動後才重建陣列
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # task_id -> (id, title, difficulty, deadline_ts)
+        self._entries: dict[int, tuple] | None = None
+        self._columns: StressColumns | None = None
+        # 每次異動都 +1，用來偵測「載入期間有人寫入」的競態
+        self._generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    def begin_load(self) -> int:
+        """在查詢 DB 之前呼叫，取得目前的世代編號"""
+        with self._lock:
+            return self._generation
+
+    def load(self, rows: Iterable, generation: int) -> bool:
+        """
+        以 (id, title, difficulty, deadline) rows 建立聚合。
+        若查詢期間已有異動 (世代編號改變)，放棄這次載入，下次再重試。
+        """
+        entries = {
+            row.id: (row.id, row.title, row.difficulty, _to_timestamp(row.deadline))
+            for row in rows
+        }
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries = entries
+            self._columns = None
+            return True
+
+    def upsert(self, task) -> None:
+        """任務寫入 DB (commit) 之後呼叫，依最新狀態加入或移除"""
+        with self._lock:
+            self._generation += 1
+            if self._entries is None:
+                return
+            self._columns = None
+            if not is_stress_source(task.type, task.status):
+                self._entries.pop(task.id, None)
+                return
+            self._entries[task.id] = (task.id, task.title, task.difficulty, _to_timestamp(task.deadline))
+
+    def discard(self, task_id: int) -> None:
+        """任務從 DB 刪除之後呼叫"""
+        with self._lock:
+            self._generation += 1
+            if self._entries is not None:
+                self._entries.pop(task_id, None)
+                self._columns = None
+
+    def invalidate(self) -> None:
+        """丟棄聚合 (例如 DB 被外部修改)，下次使用時重新載入"""
+        with self._lock:
+            self._generation += 1
+            self._entries = None
+            self._columns = None
+
+    def columns(self) -> StressColumns:
+        with self._lock:
+            if self._entries is None:
+                raise RuntimeError("StressAggregate is not loaded")
+            if self._columns is None:
+                self._columns = StressColumns.from_rows(self._entries.values())
+            return self._columns
+
+    def compute(self, now: datetime) -> tuple[float, list[dict]]:
+        """
+        回傳 (total_stress, stress_breakdown)
+        """
+        columns = self.columns()
+        days_left, stress = compute_stress(columns, now)
+
+        stress_breakdown = [
+            {
+                "task_title": title,
+                "days_left": round(days, 1),
+                "stress_impact": round(impact, 1)
+            }
+            for title, days, impact in zip(columns.titles, days_left.tolist(), stress.tolist())
+        ]
+        return float(stress.sum()), stress_breakdown
+
+    def total_stress(self, now: datetime) -> float:
+        """只要總壓力時使用 (不組 breakdown)"""
+        _, stress = compute_stress(self.columns(), now)
+        return float(stress.sum())
+
+
+stress_aggregate = StressAggregate()
@@ -1,10 +1,48 @@
 # app/services/task_service.py
-from sqlalchemy.orm import Session
-from app.models.task import Task
-from app.schemas.task import TaskCreate
+from datetime import datetime
 
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task, TaskStatus, TaskType
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.event_bus import event_bus
+from app.services.response_cache import data_version
+from app.services.stress_service import stress_aggregate
 
-def create_new_task(db: Session, task_in: TaskCreate) -> Task:
+
+async def list_tasks(
+    db: AsyncSession,
+    *,
+    status: TaskStatus | None = None,
+    task_type: TaskType | None = None,
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+    after_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100
+) -> list[Task]:
+    """
+    篩選 + keyset 分頁：以 id 遞增排序，after_id 為上一頁最後一筆的 id
+    (deadline 篩選條件需為 UTC，會排除沒有死線的任務)
+    """
+    query = select(Task)
+    if status is not None:
+        query = query.where(Task.status == status)
+    if task_type is not None:
+        query = query.where(Task.type == task_type)
+    if deadline_from is not None:
+        query = query.where(Task.deadline >= deadline_from)
+    if deadline_to is not None:
+        query = query.where(Task.deadline <= deadline_to)
+    if after_id is not None:
+        query = query.where(Task.id > after_id)
+
+    query = query.order_by(Task.id).offset(skip).limit(limit)
+    result = await db.scalars(query)
+    return list(result)
+
+
+async def create_new_task(db: AsyncSession, task_in: TaskCreate) -> Task:
     """
     接收 Pydantic 模型，轉換為 ORM 模型並寫入資料庫
     """
@@ -17,9 +55,96 @@ def create_new_task(db: Session, task_in: TaskCreate) -> Task:
 
     # 3. 加入 Session 並提交
     db.add(db_task)
-    db.commit()
+    await db.commit()
 
     # 4. 重新整理 (因為資料庫會自動生成 ID 和 created_at，我們需要拿回來)
-    db.refresh(db_task)
+    await db.refresh(db_task)
+
+    # 5. 同步壓力聚合、讓 GET 快取失效、推播給訂閱者
+    stress_aggregate.upsert(db_task)
+    data_version.bump()
+    event_bus.publish_task(db_task)
 
     return db_task
+
+
+async def create_tasks_bulk(db: AsyncSession, tasks_in: list[TaskCreate]) -> list[Task]:
+    """
+    批次建立任務：單一 transaction、一次 INSERT ... RETURNING 拿回 ID 與時間戳
+    """
+    db_tasks = await insert_tasks_bulk(db, tasks_in)
+    if db_tasks:
+        await db.commit()
+        tasks_created(db_tasks)
+    return db_tasks
+
+
+async def insert_tasks_bulk(db: AsyncSession, tasks_in: list[TaskCreate]) -> list[Task]:
+    """
+    只執行批次 INSERT，不 commit (由呼叫端控制交易)；commit 之後要呼叫 tasks_created()
+    """
+    if not tasks_in:
+        return []
+
+    # sort_by_parameter_order 確保回傳順序與輸入一致
+    result = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        [task_in.model_dump() for task_in in tasks_in]
+    )
+    return list(result)
+
+
+def tasks_created(db_tasks: list[Task]) -> None:
+    """
+    新任務 commit 之後：同步壓力聚合、讓 GET 快取失效、推播給訂閱者
+    """
+    if not db_tasks:
+        return
+    for db_task in db_tasks:
+        stress_aggregate.upsert(db_task)
+        event_bus.publish_task(db_task)
+    data_version.bump()
+
+
+async def update_task(db: AsyncSession, task: Task, task_in: TaskUpdate) -> Task:
+    """
+    部分更新任務 (只改有傳的欄位)
+    """
+    # Pydantic v2 的 update 寫法
+    update_data = task_in.model_dump(exclude_unset=True)  # 只取有傳的欄位
+    for field, value in update_data.items():
+        setattr(task, field, value)
+
+    db.add(task)
+    await db.commit()
+    await db.refresh(task)
+
+    stress_aggregate.upsert(task)
+    data_version.bump()
+    event_bus.publish_task(task)
+    return task
+
+
+async def mark_completed(db: AsyncSession, task_id: int) -> Task | None:
+    """
+    條件式 UPDATE 把任務標記為完成，回傳更新後的任務
+    已完成或不存在時回傳 None (重複送出只有一次會成功)；不 commit，由呼叫端控制交易
+    """
+    result = await db.scalars(
+        update(Task)
+        .where(Task.id == task_id, Task.status != TaskStatus.COMPLETED)
+        .values(status=TaskStatus.COMPLETED)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    return result.first()
+
+
+async def delete_task(db: AsyncSession, task: Task) -> None:
+    task_id = task.id
+    await db.delete(task)
+    await db.commit()
+
+    stress_aggregate.discard(task_id)
+    data_version.bump()
+    event_bus.publish_task_deleted(task_id)
@@ -0,0 +1,86 @@
+# app/services/transcript_policy.py
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.utils.counters import Counters
+
+# 低信心片段前後多留一點音訊，避免切到字
+CORRECTION_WINDOW_PAD_SEC = 0.3
+# 低信心片段佔總長超過這個比例就整段校正 (切太多段反而多花請求)
+CORRECTION_FULL_RATIO = 0.6
+
+# correction_skip / correction_partial / correction_full / correction_fallback (依計畫分類的次數)
+# correction_audio_sec_total / correction_audio_sec_sent (送去 Gemini 的音訊秒數)
+# vad_trimmed_sec (本地 VAD 去掉的靜音秒數)
+speech_counters = Counters()
+
+
+@dataclass(frozen=True)
+class CorrectionWindow:
+    """要送去校正的一段音訊，涵蓋 segments[first_segment:last_segment + 1]"""
+    start: float
+    end: float
+    first_segment: int
+    last_segment: int
+
+
+@dataclass(frozen=True)
+class CorrectionPlan:
+    mode: str  # skip / partial / full
+    reason: str
+    windows: tuple[CorrectionWindow, ...] = ()
+
+
+def is_low_confidence(segment: dict[str, Any]) -> bool:
+    """
+    Whisper 的 avg_logprob 太低 (不確定聽到什麼)，或 no_speech_prob 高卻有文字 (可能是幻聽)
+    """
+    if segment.get("avg_logprob", float("-inf")) < settings.CORRECTION_MIN_AVG_LOGPROB:
+        return True
+    no_speech_prob = segment.get("no_speech_prob", 0.0)
+    return no_speech_prob > settings.CORRECTION_MAX_NO_SPEECH_PROB and bool((segment.get("text") or "").strip())
+
+
+def plan_correction(segments: list[dict[str, Any]], mode: str | None = None) -> CorrectionPlan:
+    """
+    依 Groq verbose_json segments 的信心決定 Gemini 校正範圍：
+    - 全部高信心 -> skip (直接用 Groq 粗稿)
+    - 少數低信心 -> partial (只送低信心片段的音訊窗)
+    - 大量低信心 / 無法判斷 -> full (原本的整段校正)
+    """
+    mode = mode or settings.TRANSCRIPT_CORRECTION_MODE
+    if mode == "never":
+        return CorrectionPlan("skip", "correction disabled")
+    if mode == "always":
+        return CorrectionPlan("full", "correction forced")
+
+    if not segments or any("avg_logprob" not in seg or "end" not in seg for seg in segments):
+        return CorrectionPlan("full", "no segment confidence available")
+
+    low = [i for i, seg in enumerate(segments) if is_low_confidence(seg)]
+    if not low:
+        return CorrectionPlan("skip", f"all {len(segments)} segments confident")
+
+    total_sec = max(seg["end"] for seg in segments) or 1.0
+    low_sec = sum(segments[i]["end"] - segments[i]["start"] for i in low)
+    ratio = low_sec / total_sec
+    if ratio > CORRECTION_FULL_RATIO:
+        return CorrectionPlan("full", f"{len(low)}/{len(segments)} segments low confidence ({ratio:.0%} of audio)")
+
+    # 相鄰 (含 padding 後重疊) 的低信心片段合併成同一個窗
+    windows: list[CorrectionWindow] = []
+    for i in low:
+        start = max(segments[i]["start"] - CORRECTION_WINDOW_PAD_SEC, 0.0)
+        end = segments[i]["end"] + CORRECTION_WINDOW_PAD_SEC
+        if windows and (windows[-1].last_segment == i - 1 or start <= windows[-1].end):
+            prev = windows[-1]
+            windows[-1] = CorrectionWindow(prev.start, max(prev.end, end), prev.first_segment, i)
+        else:
+            windows.append(CorrectionWindow(start, end, i, i))
+
+    return CorrectionPlan(
+        "partial",
+        f"{len(low)}/{len(segments)} segments low confidence ({ratio:.0%} of audio)",
+        tuple(windows)
+    )
@@ -0,0 +1,149 @@
+# app/services/vad.py
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.audio_spool import AudioSpool
+
+# 能量式 VAD：30ms 一個 frame，依 dBFS 判斷有無人聲
+VAD_FRAME_SEC = 0.03
+# 比這個還小聲一律當靜音
+VAD_MIN_DBFS = -45.0
+# 自適應門檻：背景噪音 (第 10 百分位) + margin，但至少比最大音量 (第 99 百分位) 低這麼多
+VAD_NOISE_MARGIN_DB = 12.0
+VAD_PEAK_HEADROOM_DB = 25.0
+# 短於這個長度的停頓保留 (自然語氣停頓)，短於 VAD_MIN_SPEECH_SEC 的聲音當雜訊
+VAD_MAX_GAP_SEC = 0.6
+VAD_MIN_SPEECH_SEC = 0.15
+# 每段人聲前後保留，避免切掉字頭字尾
+VAD_PAD_SEC = 0.2
+# 能省下的靜音太少就不重寫檔案
+VAD_MIN_TRIM_SEC = 1.0
+# 一次處理多少 frame (限制 float 暫存陣列大小)
+VAD_BLOCK_FRAMES = 8192
+
+
+@dataclass(frozen=True)
+class VadResult:
+    """
+    audio: 去掉靜音後的 wav (沒裁切時就是原本的暫存檔)
+    boundaries: 裁切後時間軸上，原本靜音被移除的位置 (適合切 chunk 的點)
+    """
+    audio: AudioSpool
+    original_sec: float
+    speech_sec: float
+    boundaries: tuple[float, ...]
+
+    @property
+    def trimmed(self) -> bool:
+        return self.speech_sec < self.original_sec
+
+
+def _open_pcm(path: str) -> tuple[np.ndarray, int]:
+    """以 memmap 讀取 16-bit mono PCM wav 的 samples (不整個載入記憶體)"""
+    with open(path, "rb") as f:
+        with wave.open(f, "rb") as reader:
+            if reader.getsampwidth() != 2 or reader.getnchannels() != 1:
+                raise ValueError("VAD expects 16-bit mono PCM wav")
+            rate = reader.getframerate()
+            frames = reader.getnframes()
+            # wave 讀完 header 後，檔案位置停在 data chunk 開頭
+            offset = f.tell()
+    if frames == 0:
+        return np.zeros(0, dtype="<i2"), rate
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(frames,)), rate
+
+
+def _frame_dbfs(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    count = len(samples) // frame_len
+    db = np.empty(count, dtype=np.float32)
+    for first in range(0, count, VAD_BLOCK_FRAMES):
+        last = min(first + VAD_BLOCK_FRAMES, count)
+        block = samples[first * frame_len:last * frame_len].astype(np.float32).reshape(last - first, frame_len)
+        rms = np.sqrt(np.mean(np.square(block), axis=1)) / 32768.0
+        db[first:last] = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    return db
+
+
+def detect_speech(samples: np.ndarray, rate: int) -> list[tuple[float, float]]:
+    """
+    回傳人聲區段 [(start_sec, end_sec)]，已合併短停頓並加上 padding
+    """
+    frame_len = int(rate * VAD_FRAME_SEC)
+    db = _frame_dbfs(samples, frame_len)
+    if db.size == 0:
+        return []
+
+    noise_floor, peak = np.percentile(db, [10, 99])
+    threshold = max(VAD_MIN_DBFS, min(noise_floor + VAD_NOISE_MARGIN_DB, peak - VAD_PEAK_HEADROOM_DB))
+    voiced = np.concatenate(([0], (db > threshold).astype(np.int8), [0]))
+    edges = np.diff(voiced)
+    starts = np.flatnonzero(edges == 1) * VAD_FRAME_SEC
+    ends = np.flatnonzero(edges == -1) * VAD_FRAME_SEC
+
+    regions: list[list[float]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if regions and start - regions[-1][1] < VAD_MAX_GAP_SEC:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    total_sec = len(samples) / rate
+    padded: list[tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < VAD_MIN_SPEECH_SEC:
+            continue
+        start, end = max(start - VAD_PAD_SEC, 0.0), min(end + VAD_PAD_SEC, total_sec)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded
+
+
+def trim_silence(wav: AudioSpool) -> VadResult:
+    """
+    移除開頭、結尾與中間的長靜音，把人聲區段接成新的 wav 暫存檔 (CPU 工作，請在 thread 中呼叫)
+    """
+    samples, rate = _open_pcm(wav.path)
+    original_sec = len(samples) / rate
+    regions = detect_speech(samples, rate)
+    speech_sec = sum(end - start for start, end in regions)
+
+    if original_sec - speech_sec < VAD_MIN_TRIM_SEC:
+        return VadResult(wav, original_sec, original_sec, ())
+
+    trimmed = AudioSpool.create(suffix=".wav")
+    boundaries: list[float] = []
+    cursor = 0.0
+    with wave.open(trimmed.file, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        for start, end in regions:
+            chunk = samples[int(start * rate):int(end * rate)]
+            writer.writeframes(chunk.tobytes())
+            cursor += len(chunk) / rate
+            boundaries.append(round(cursor, 3))
+    trimmed.file.flush()
+    trimmed.size = trimmed.file.tell()
+    # 最後一個邊界就是結尾，不是可切點
+    return VadResult(trimmed, original_sec, round(cursor, 3), tuple(boundaries[:-1]))
+
+
+def plan_chunks(total_sec: float, boundaries: tuple[float, ...], max_chunk_sec: float) -> list[tuple[float, float]]:
+    """
+    把音訊切成不超過 max_chunk_sec 的 chunk，盡量切在原本是靜音的位置
+    """
+    chunks: list[tuple[float, float]] = []
+    start = 0.0
+    while total_sec - start > max_chunk_sec:
+        limit = start + max_chunk_sec
+        candidates = [b for b in boundaries if start < b <= limit]
+        # 沒有合適的靜音點 (一整段連續講話) 就硬切
+        cut = candidates[-1] if candidates and candidates[-1] - start >= max_chunk_sec / 2 else limit
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, total_sec))
+    return chunks
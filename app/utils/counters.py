@@ -0,0 +1,28 @@
+"""In-process named counters (thread-safe)."""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+
+
+class Counters:
+    """
+    Monotonic counters keyed by name, e.g. how often a pipeline stage was skipped.
+
+    Usage:
+        counters = Counters()
+        counters.incr("correction_skipped")
+        counters.snapshot()  # {"correction_skipped": 1}
+    """
+
+    def __init__(self):
+        self._values: defaultdict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[name] += amount
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {name: round(value, 3) for name, value in sorted(self._values.items())}
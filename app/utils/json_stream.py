@@ -0,0 +1,104 @@
+"""Incremental extraction of array items from a JSON document that arrives in chunks."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class JsonArrayItemStream:
+    """
+    Yield each item of the first JSON array as soon as it is complete.
+
+    Works for both ``{"tasks": [{...}, {...}]}`` and a bare ``[{...}, {...}]``.
+    Items that are not objects (strings, numbers, null, nested arrays) are yielded
+    too, so callers can reject them the same way as a fully parsed document.
+    Only the text of the item currently being received is buffered.
+
+    Usage:
+        stream = JsonArrayItemStream()
+        for chunk in chunks:
+            for item in stream.feed(chunk):
+                ...
+        stream.close()  # raises ValueError if the array never closed
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._depth = 0
+        self._array_depth: int | None = None
+        self._item_start: int | None = None
+        # The current item is a bare number / true / false / null (ends at "," "]" or whitespace)
+        self._in_literal = False
+        self._in_string = False
+        self._escape = False
+        self.finished = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        items: list[Any] = []
+        if self.finished:
+            return items
+
+        offset = len(self._buffer)
+        self._buffer += chunk
+        for i in range(offset, len(self._buffer)):
+            char = self._buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._item_start is not None and self._depth == self._array_depth:
+                        # A string item of the array itself
+                        items.append(self._decode(self._buffer[self._item_start:i + 1]))
+                        self._item_start = None
+                continue
+
+            at_array_level = self._array_depth is not None and self._depth == self._array_depth
+            if self._in_literal and (char in ",]" or char.isspace()):
+                items.append(self._decode(self._buffer[self._item_start:i]))
+                self._item_start = None
+                self._in_literal = False
+
+            if char == '"':
+                self._in_string = True
+                if at_array_level and self._item_start is None:
+                    self._item_start = i
+            elif char in "{[":
+                if at_array_level and self._item_start is None:
+                    self._item_start = i
+                self._depth += 1
+                if self._array_depth is None and char == "[":
+                    self._array_depth = self._depth
+            elif char in "}]":
+                if self._item_start is not None and self._depth == self._array_depth + 1:
+                    items.append(self._decode(self._buffer[self._item_start:i + 1]))
+                    self._item_start = None
+                elif char == "]" and self._depth == self._array_depth:
+                    self.finished = True
+                    self._depth -= 1
+                    break
+                self._depth -= 1
+            elif at_array_level and self._item_start is None and char != "," and not char.isspace():
+                self._item_start = i
+                self._in_literal = True
+
+        # Keep only the unfinished item
+        if self._item_start is None:
+            self._buffer = ""
+        else:
+            self._buffer = self._buffer[self._item_start:]
+            self._item_start = 0
+        return items
+
+    def close(self) -> None:
+        if not self.finished:
+            raise ValueError("JSON stream ended before the array was closed")
+
+    @staticmethod
+    def _decode(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"AI output item is not valid JSON: {e}")
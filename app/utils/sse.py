@@ -0,0 +1,25 @@
+"""Server-Sent Events helpers."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Disable proxy buffering (nginx) so events reach the client as they are sent
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: str | None = None) -> str:
+    """Encode one SSE message; ``data`` is serialized as a single JSON line."""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def format_sse_comment(text: str = "keep-alive") -> str:
+    """Comment line: ignored by EventSource, keeps idle connections open."""
+    return f": {text}\n\n"
@@ -0,0 +1,59 @@
+"""Lightweight per-stage wall-clock timing for request pipelines."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Collect wall-clock durations (seconds) per named stage.
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("groq"):
+            ...
+        timer.timings  # {"groq": 1.234}
+
+    ``on_stage(name, seconds)`` is called each time a stage finishes
+    successfully (e.g. to report progress of a background job).
+    ``observe(name, seconds)`` receives the duration of every single run,
+    failed ones included (e.g. to feed a latency histogram).
+    """
+
+    def __init__(
+        self,
+        on_stage: Callable[[str, float], None] | None = None,
+        observe: Callable[[str, float], None] | None = None,
+    ):
+        self._started = time.perf_counter()
+        self._on_stage = on_stage
+        self._observe = observe
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Same stage entered twice (e.g. retries) accumulates
+            elapsed = time.perf_counter() - start
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 3)
+            if self._observe is not None:
+                self._observe(name, elapsed)
+        if self._on_stage is not None:
+            self._on_stage(name, self.timings[name])
+
+    def mark(self, name: str) -> None:
+        """Record the time elapsed since the timer started (e.g. time to first result)."""
+        self.timings[name] = self.total()
+
+    def total(self) -> float:
+        return round(time.perf_counter() - self._started, 3)
+
+    def summary(self) -> str:
+        parts = [f"{name}={seconds:.3f}s" for name, seconds in self.timings.items()]
+        parts.append(f"total={self.total():.3f}s")
+        return " ".join(parts)
@@ -0,0 +1,68 @@
+# benchmarks/compare.py
+"""
+比較兩次 benchmark 結果 (例如 main vs. 功能分支)
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json --threshold 0.1
+
+p95 延遲變慢或吞吐量下降超過 threshold 視為退步，exit code 1 (可直接放進 CI)
+"""
+import argparse
+import json
+import sys
+
+
+def _change(base: float, new: float) -> float | None:
+    return None if not base else (new - base) / base
+
+
+def _fmt(change: float | None) -> str:
+    return "n/a" if change is None else f"{change:+.1%}"
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[str]:
+    """印出比較表，回傳退步的 scenario 名稱"""
+    regressions = []
+    header = f"{'scenario':<32}{'p50':>24}{'p95':>24}{'p99':>24}{'rps':>24}"
+    print(header)
+    print("-" * len(header))
+    for name, n in new["scenarios"].items():
+        b = base["scenarios"].get(name)
+        if b is None:
+            print(f"{name:<32}  (not in base)")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            cells.append(f"{b[key]:.1f}->{n[key]:.1f} {_fmt(_change(b[key], n[key])):>7}")
+        print(f"{name:<32}" + "".join(f"{cell:>24}" for cell in cells))
+
+        p95_change = _change(b["p95_ms"], n["p95_ms"])
+        rps_change = _change(b["throughput_rps"], n["throughput_rps"])
+        if (p95_change is not None and p95_change > threshold) or (rps_change is not None and rps_change < -threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed p95 / throughput change (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    for label, report in (("base", base), ("new", new)):
+        meta = report["meta"]
+        print(f"{label}: {meta.get('git_commit')} {meta.get('mode')} {meta.get('database')} tasks={meta.get('max_task_id')}")
+
+    regressions = compare(base, new, args.threshold)
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
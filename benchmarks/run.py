@@ -0,0 +1,350 @@
+# benchmarks/run.py
+"""
+任務 CRUD / dashboard / commit 端點的延遲與吞吐量 benchmark
+
+    # 行程內 (httpx ASGITransport，不經過網路)
+    python -m benchmarks.run --tasks 100000 --concurrency 1,16
+    # 啟動 uvicorn 子行程，經過真正的 HTTP
+    python -m benchmarks.run --tasks 100000 --concurrency 16,64 --spawn-uvicorn --workers 1
+    # 打已經在跑的伺服器 (資料需先用 benchmarks.seed 灌好)
+    python -m benchmarks.run --url http://127.0.0.1:8000 --skip-seed
+
+結果寫到 benchmarks/results/<時間>-<commit>.json，用 benchmarks.compare 比較兩次結果
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import numpy as np
+from sqlalchemy.engine import make_url
+
+from benchmarks.seed import DEFAULT_DATABASE_URL, ROOT, configure_environment, seed_database
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+API = "/api/v1"
+SERVER_START_TIMEOUT_SEC = 30
+
+# (method, path, json body)
+RequestSpec = tuple[str, str, dict | None]
+
+
+@dataclass
+class BenchContext:
+    max_task_id: int
+    # commit 每個任務只能成功一次，事先挑好未完成的任務 id
+    committable_ids: list[int]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable[[random.Random, BenchContext], RequestSpec]
+
+
+def _read_tasks(rng: random.Random, ctx: BenchContext) -> RequestSpec:
+    # 混合：第一頁、篩選、死線區間、深頁 cursor
+    kind = rng.random()
+    if kind < 0.25:
+        return "GET", f"{API}/tasks/?limit=100", None
+    if kind < 0.5:
+        status = rng.choice(["draft", "staged", "completed"])
+        task_type = rng.choice(["school", "skill", "misc"])
+        return "GET", f"{API}/tasks/?status={status}&type={task_type}&limit=50", None
+    if kind < 0.75:
+        start = datetime.now(timezone.utc) + timedelta(days=rng.randint(-7, 30))
+        end = start + timedelta(days=7)
+        return "GET", f"{API}/tasks/?deadline_from={start:%Y-%m-%dT%H:%M:%SZ}&deadline_to={end:%Y-%m-%dT%H:%M:%SZ}", None
+    return "GET", f"{API}/tasks/?cursor={rng.randrange(ctx.max_task_id)}&limit=100", None
+
+
+def _create_task(rng: random.Random, ctx: BenchContext) -> RequestSpec:
+    task_type = rng.choice(["school", "skill", "misc"])
+    body = {
+        "title": f"bench create {rng.randrange(10**9)}",
+        "type": task_type,
+        "difficulty": rng.randint(1, 10),
+        "xp_value": 100 if task_type == "skill" else 0,
+        "deadline": f"{datetime.now(timezone.utc) + timedelta(days=rng.randint(1, 30)):%Y-%m-%dT%H:%M:%SZ}",
+    }
+    return "POST", f"{API}/tasks/", body
+
+
+def _update_task(rng: random.Random, ctx: BenchContext) -> RequestSpec:
+    body = {"title": f"bench update {rng.randrange(10**9)}", "difficulty": rng.randint(1, 10)}
+    return "PATCH", f"{API}/tasks/{rng.randint(1, ctx.max_task_id)}", body
+
+
+def _commit_task(rng: random.Random, ctx: BenchContext) -> RequestSpec:
+    return "POST", f"{API}/tasks/{ctx.committable_ids.pop()}/commit", None
+
+
+def _dashboard(rng: random.Random, ctx: BenchContext) -> RequestSpec:
+    return "GET", f"{API}/dashboard/", None
+
+
+# 依序執行：讀取在前，會改資料的在後
+SCENARIOS = {
+    s.name: s for s in (
+        Scenario("read_tasks", _read_tasks),
+        Scenario("get_dashboard_status", _dashboard),
+        Scenario("create_task", _create_task),
+        Scenario("update_task", _update_task),
+        Scenario("commit_task", _commit_task),
+    )
+}
+
+
+def load_context(commits_needed: int, rng: random.Random) -> BenchContext:
+    from sqlalchemy import func, select
+
+    from app.core.database import SessionLocal
+    from app.models.task import Task, TaskStatus
+
+    with SessionLocal() as db:
+        max_id = db.scalar(select(func.max(Task.id))) or 0
+        ids = list(db.scalars(
+            select(Task.id)
+            .where(Task.status.in_([TaskStatus.DRAFT, TaskStatus.STAGED]))
+            .order_by(Task.id)
+            .limit(commits_needed)
+        ))
+    if max_id == 0:
+        raise SystemExit("Benchmark database has no tasks; run without --skip-seed or use benchmarks.seed")
+    rng.shuffle(ids)
+    return BenchContext(max_task_id=max_id, committable_ids=ids)
+
+
+def summarize(latencies: list[float], statuses: Counter, elapsed: float) -> dict:
+    ms = np.array(latencies) * 1000
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: BenchContext,
+    rng: random.Random,
+    requests: int,
+    concurrency: int,
+    warmup: int
+) -> dict:
+    for _ in range(warmup):
+        method, path, body = scenario.build(rng, ctx)
+        try:
+            await client.request(method, path, json=body)
+        except httpx.TransportError:
+            pass
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        # 所有 worker 共用同一個 iterator，總請求數固定
+        for _ in remaining:
+            method, path, body = scenario.build(rng, ctx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+            except httpx.TransportError as e:
+                # 伺服器斷線 / 逾時也算一次失敗的請求，不中斷整個 benchmark
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def in_process_client():
+    from app.main import app
+
+    # ASGITransport 不會觸發 lifespan，手動進入 (啟動 HTTP 連線池、speech job worker)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+@asynccontextmanager
+async def http_client(base_url: str, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_uvicorn(workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=ROOT,
+        env=os.environ.copy()
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SEC
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}{API}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("uvicorn did not become healthy in time")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict[str, dict]) -> None:
+    header = f"{'scenario':<32}{'reqs':>7}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<32}{r['requests']:>7}{r['errors']:>6}{r['throughput_rps']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+
+
+async def run(
+    args: argparse.Namespace, scenarios: list[Scenario], concurrencies: list[int]
+) -> tuple[dict[str, dict], int]:
+    rng = random.Random(args.seed)
+    rounds = len(concurrencies) * (args.requests + args.warmup)
+    ctx = load_context(rounds if "commit_task" in args.scenarios else 0, rng)
+    if "commit_task" in args.scenarios and len(ctx.committable_ids) < rounds:
+        raise SystemExit(f"commit_task needs {rounds} uncompleted tasks, database has {len(ctx.committable_ids)}")
+
+    results: dict[str, dict] = {}
+    if args.base_url is None:
+        client_cm = in_process_client()
+    else:
+        client_cm = http_client(args.base_url, max(concurrencies))
+    async with client_cm as client:
+        for concurrency in concurrencies:
+            for scenario in scenarios:
+                key = f"{scenario.name}@c{concurrency}"
+                results[key] = await run_scenario(
+                    client, scenario, ctx, rng, args.requests, concurrency, args.warmup
+                )
+                print(f"  {key}: p50={results[key]['p50_ms']}ms rps={results[key]['throughput_rps']}", flush=True)
+    return results, ctx.max_task_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark task CRUD, dashboard and commit endpoints")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--tasks", type=int, default=10_000, help="Seeded tasks (10^3 - 10^6)")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the existing benchmark database")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario and concurrency")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", default="1,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of scenarios")
+    parser.add_argument("--url", dest="base_url", default=None, help="Benchmark a running server instead of in-process")
+    parser.add_argument("--spawn-uvicorn", action="store_true", help="Start uvicorn on the benchmark database")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --spawn-uvicorn")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Result JSON path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    scenarios = [SCENARIOS[name] for name in SCENARIOS if name in args.scenarios]
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+
+    configure_environment(args.database_url)
+    seed_info = None
+    if not args.skip_seed:
+        seed_info = seed_database(args.tasks, args.seed)
+        print(f"Seeded {args.tasks} tasks in {seed_info['seconds']}s")
+
+    server = None
+    if args.spawn_uvicorn:
+        server, args.base_url = spawn_uvicorn(args.workers)
+    try:
+        results, max_task_id = asyncio.run(run(args, scenarios, concurrencies))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(results)
+    mode = "uvicorn" if args.spawn_uvicorn else ("http" if args.base_url else "in-process")
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": make_url(args.database_url).get_backend_name(),
+            "seeded_tasks": args.tasks if seed_info else None,
+            "max_task_id": max_task_id,
+            "mode": mode,
+            "workers": args.workers if args.spawn_uvicorn else None,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": concurrencies,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['git_commit'] or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/seed.py
+"""
+建立 benchmark 用資料庫：跑 alembic migration 後灌入指定數量的任務
+
+    python -m benchmarks.seed --tasks 100000 --database-url sqlite:////tmp/entropy_bench.db
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'entropy_bench.db')}"
+SEED_BATCH_SIZE = 10_000
+
+# 分佈大致依照實際使用：學校任務最多、大部分任務在 staged
+TYPE_WEIGHTS = {"SCHOOL": 0.45, "SKILL": 0.35, "MISC": 0.20}
+STATUS_WEIGHTS = {"DRAFT": 0.15, "STAGED": 0.55, "COMPLETED": 0.25, "INCINERATED": 0.05}
+# 有死線的任務落在 [now - 30 天, now + 60 天]
+DEADLINE_RATIO = 0.8
+DEADLINE_PAST_DAYS = 30
+DEADLINE_FUTURE_DAYS = 60
+
+
+def configure_environment(database_url: str) -> None:
+    """
+    app.core.config 在 import 時讀取環境變數，必須在 import app 之前呼叫
+    benchmark 不會呼叫 Groq / Gemini，API key 給假值即可
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("SPEECH_CACHE_ENABLED", "false")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def migrate() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    command.upgrade(config, "head")
+
+
+def _task_rows(count: int, first_id: int, rng: random.Random, now: datetime):
+    from app.models.task import TaskStatus, TaskType
+
+    types = [TaskType[name] for name in TYPE_WEIGHTS]
+    statuses = [TaskStatus[name] for name in STATUS_WEIGHTS]
+    type_choices = rng.choices(types, weights=list(TYPE_WEIGHTS.values()), k=count)
+    status_choices = rng.choices(statuses, weights=list(STATUS_WEIGHTS.values()), k=count)
+    span_sec = (DEADLINE_PAST_DAYS + DEADLINE_FUTURE_DAYS) * 86400
+
+    rows = []
+    for i in range(count):
+        task_type = type_choices[i]
+        deadline = None
+        if rng.random() < DEADLINE_RATIO:
+            deadline = now - timedelta(days=DEADLINE_PAST_DAYS) + timedelta(seconds=rng.randrange(span_sec))
+        created_at = now - timedelta(seconds=rng.randrange(90 * 86400))
+        rows.append({
+            "id": first_id + i,
+            "title": f"bench task {first_id + i}",
+            "type": task_type,
+            "status": status_choices[i],
+            "difficulty": rng.randint(1, 10),
+            "xp_value": rng.randrange(50, 501, 10) if task_type == TaskType.SKILL else 0,
+            "deadline": deadline,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    return rows
+
+
+def seed_database(n_tasks: int, seed: int = 42) -> dict:
+    """
+    清空 tasks / users 後重新灌資料 (configure_environment 之後呼叫)
+    使用同步 engine + executemany 分批寫入，SQLite / PostgreSQL 皆可
+    """
+    from sqlalchemy import delete, insert
+
+    from app.core.database import engine
+    from app.models.task import Task
+    from app.models.user import User
+
+    migrate()
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        conn.execute(delete(Task))
+        conn.execute(delete(User))
+        conn.execute(insert(User).values(
+            id=1,
+            username="Commander",
+            level=1.0,
+            current_xp=0,
+            blackhole_days=7.0,
+            last_blackhole_update=now.replace(tzinfo=None),
+            last_login=now.replace(tzinfo=None)
+        ))
+        for first in range(0, n_tasks, SEED_BATCH_SIZE):
+            count = min(SEED_BATCH_SIZE, n_tasks - first)
+            conn.execute(insert(Task), _task_rows(count, first + 1, rng, now))
+
+    # PostgreSQL 明確指定 id 後 sequence 不會前進，之後的 INSERT 會撞 id
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy import text
+        with engine.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('tasks', 'id'), COALESCE(MAX(id), 1)) FROM tasks"))
+
+    return {"tasks": n_tasks, "seed": seed, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a benchmark database with synthetic tasks")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--tasks", type=int, default=10_000, help="Number of tasks (10^3 - 10^6)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    result = seed_database(args.tasks, args.seed)
+    print(f"Seeded {result['tasks']} tasks into {args.database_url} in {result['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# benchmarks/speech.py
+"""
+語音流程離線 benchmark：Groq / Gemini 換成本機 stub server，跑完整的 process_audio_instruction
+
+    python -m benchmarks.speech --formats wav,mp3,webm --lengths 5,60,300 --concurrency 1,4 --requests 8
+    python -m benchmarks.speech --gemini-latency 2 --gemini-failure-rate 0.1 --tracemalloc
+
+音檔語料用 ffmpeg 產生 (有聲段 + 靜音段 + 底噪，會觸發 VAD 裁切與分段轉錄)，快取在 --corpus-dir
+報告：各階段耗時佔比、延遲分佈、記憶體高水位 (RSS 取樣 / tracemalloc)、並行上傳時的錯誤分佈
+結果格式同 benchmarks.run，可用 benchmarks.compare 比較
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+from benchmarks.run import RESULTS_DIR, _free_port, _git_commit, print_report, summarize
+from benchmarks.seed import DEFAULT_DATABASE_URL, ROOT, configure_environment
+from benchmarks.stub_server import add_stub_arguments
+
+# 副檔名 -> (ffmpeg encoder, 上傳時的 content-type)
+FORMATS = {
+    "wav": ("pcm_s16le", "audio/wav"),
+    "mp3": ("libmp3lame", "audio/mpeg"),
+    "webm": ("libopus", "audio/webm"),
+    "m4a": ("aac", "audio/mp4"),
+}
+# 每 5 秒講 3.5 秒、停 1.5 秒
+SPEECH_PATTERN = "if(lt(mod(t,5),3.5),0.5,0)"
+RSS_SAMPLE_INTERVAL_SEC = 0.05
+STUB_START_TIMEOUT_SEC = 15
+
+
+def generate_corpus(corpus_dir: str, formats: list[str], lengths: list[int]) -> list[tuple[str, str, int, str]]:
+    """回傳 [(path, format, seconds, mime)]，已存在的檔案直接沿用"""
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = []
+    for fmt in formats:
+        encoder, mime = FORMATS[fmt]
+        for seconds in lengths:
+            path = os.path.join(corpus_dir, f"speech_{seconds}s.{fmt}")
+            if not os.path.exists(path):
+                subprocess.run(
+                    [
+                        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+                        "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=16000:duration={seconds}",
+                        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.003:sample_rate=16000:duration={seconds}",
+                        "-filter_complex", f"[0]volume='{SPEECH_PATTERN}':eval=frame[s];[s][1]amix=inputs=2:normalize=0",
+                        "-ac", "1", "-c:a", encoder, path,
+                    ],
+                    check=True
+                )
+            corpus.append((path, fmt, seconds, mime))
+    return corpus
+
+
+def spawn_stub_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    command = [sys.executable, "-m", "benchmarks.stub_server", "--port", str(port)]
+    for action in _stub_parser()._actions:
+        value = getattr(args, action.dest, None)
+        if action.option_strings and action.dest != "help" and value is not None:
+            command += [action.option_strings[0], str(value)]
+    process = subprocess.Popen(command, cwd=ROOT)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STUB_START_TIMEOUT_SEC
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"stub server exited with code {process.returncode}")
+        try:
+            httpx.get(base_url, timeout=1)
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("stub server did not start in time")
+
+
+def _stub_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(add_help=False)
+    add_stub_arguments(parser)
+    return parser
+
+
+def _current_rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+class RssSampler:
+    """定期取樣 RSS，取得單一情境的記憶體高水位 (ru_maxrss 只有整個行程生命週期的最大值)"""
+
+    def __init__(self):
+        self.peak_mb: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            rss = _current_rss_mb()
+            if rss is not None:
+                self.peak_mb = max(self.peak_mb or 0.0, rss)
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL_SEC)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def run_one(path: str, mime: str) -> tuple[str, float, dict[str, float]]:
+    from fastapi import HTTPException, UploadFile
+    from starlette.datastructures import Headers
+
+    from app.services.ai_service import ai_service
+
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        upload = UploadFile(file=f, filename=os.path.basename(path), headers=Headers({"content-type": mime}))
+        try:
+            _, _, timings = await ai_service.process_audio_instruction(upload)
+            status = "200"
+        except HTTPException as e:
+            status, timings = str(e.status_code), {}
+        except Exception as e:
+            status, timings = type(e).__name__, {}
+    return status, time.perf_counter() - started, timings
+
+
+def summarize_stages(all_timings: list[dict[str, float]]) -> dict[str, dict]:
+    """各階段平均耗時與佔總時間比例 (只算成功的請求)"""
+    per_stage: defaultdict[str, list[float]] = defaultdict(list)
+    for timings in all_timings:
+        for name, seconds in timings.items():
+            if name != "total":
+                per_stage[name].append(seconds)
+    total = sum(t.get("total", 0.0) for t in all_timings) or 1.0
+    return {
+        name: {
+            "mean_ms": round(float(np.mean(values)) * 1000, 3),
+            "p95_ms": round(float(np.percentile(values, 95)) * 1000, 3),
+            "share": round(sum(values) / total, 4),
+        }
+        for name, values in per_stage.items()
+    }
+
+
+async def run_scenario(path: str, mime: str, requests: int, concurrency: int, trace: bool) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    timings: list[dict[str, float]] = []
+
+    async def one() -> None:
+        async with semaphore:
+            status, elapsed, stage_timings = await run_one(path, mime)
+        latencies.append(elapsed)
+        statuses[status] += 1
+        if stage_timings:
+            timings.append(stage_timings)
+
+    if trace:
+        tracemalloc.start()
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    result = summarize(latencies, statuses, elapsed)
+    result["stages"] = summarize_stages(timings)
+    result["memory"] = {"rss_peak_mb": round(sampler.peak_mb, 1) if sampler.peak_mb else None}
+    if trace:
+        result["memory"]["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return result
+
+
+async def run(args: argparse.Namespace, corpus: list[tuple[str, str, int, str]], concurrencies: list[int]) -> dict:
+    from app.services.groq_client import groq_client
+
+    await groq_client.start()
+    results: dict[str, dict] = {}
+    try:
+        # 暖身：載入模組、建立連線
+        await run_one(corpus[0][0], corpus[0][3])
+        for concurrency in concurrencies:
+            for path, fmt, seconds, mime in corpus:
+                key = f"{fmt}-{seconds}s@c{concurrency}"
+                results[key] = await run_scenario(path, mime, args.requests, concurrency, args.tracemalloc)
+                split = " ".join(f"{name}={s['share']:.0%}" for name, s in results[key]["stages"].items())
+                print(f"  {key}: p50={results[key]['p50_ms']}ms {split}", flush=True)
+    finally:
+        await groq_client.close()
+    return results
+
+
+def print_stage_report(results: dict[str, dict]) -> None:
+    print("\nStage split (mean ms / share of total) and memory high-water mark")
+    for name, r in results.items():
+        split = ", ".join(f"{stage} {s['mean_ms']:.0f}ms {s['share']:.0%}" for stage, s in r["stages"].items())
+        memory = ", ".join(f"{k}={v}" for k, v in r["memory"].items())
+        print(f"  {name:<24} {split} | {memory}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline speech pipeline benchmark against stubbed Groq/Gemini")
+    parser.add_argument("--formats", default="wav,mp3,webm", help=f"Comma-separated subset of {','.join(FORMATS)}")
+    parser.add_argument("--lengths", default="5,60,300", help="Comma-separated audio lengths in seconds")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated concurrent uploads")
+    parser.add_argument("--requests", type=int, default=8, help="Uploads per file and concurrency level")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "entropy_speech_corpus"))
+    parser.add_argument("--correction-mode", default="auto", choices=["auto", "always", "never"])
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report Python heap peak (slower)")
+    parser.add_argument("--output", default=None, help="Result JSON path (default: benchmarks/results/)")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"Unknown formats: {', '.join(sorted(unknown))}")
+    lengths = [int(s) for s in args.lengths.split(",")]
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+
+    corpus = generate_corpus(args.corpus_dir, formats, lengths)
+    stub, stub_url = spawn_stub_server(args)
+    try:
+        # 設定在 import app 前生效：API 指向 stub、關閉快取 (重複的音檔不能直接命中)
+        os.environ["GROQ_API_BASE_URL"] = stub_url
+        os.environ["GEMINI_API_BASE_URL"] = stub_url
+        os.environ["GROQ_HTTP2"] = "false"
+        os.environ["TRANSCRIPT_CORRECTION_MODE"] = args.correction_mode
+        os.environ["SPEECH_CACHE_ENABLED"] = "false"
+        configure_environment(DEFAULT_DATABASE_URL)
+        results = asyncio.run(run(args, corpus, concurrencies))
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    print_report(results)
+    print_stage_report(results)
+    stub_options = {action.dest: getattr(args, action.dest) for action in _stub_parser()._actions}
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": "speech-offline",
+            "formats": formats,
+            "lengths_sec": lengths,
+            "concurrency": concurrencies,
+            "requests": args.requests,
+            "correction_mode": args.correction_mode,
+            "stub": stub_options,
+            "process_max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "children_max_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        },
+        "scenarios": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"speech-{stamp}-{report['meta']['git_commit'] or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
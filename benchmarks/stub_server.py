@@ -0,0 +1,209 @@
+# benchmarks/stub_server.py
+"""
+本機假 Groq / Gemini 伺服器 (語音流程 benchmark 用，不花 API 額度)
+
+    python -m benchmarks.stub_server --port 8765 --groq-latency 0.4 --gemini-latency 1.5 --gemini-failure-rate 0.05
+
+- Groq: POST /openai/v1/audio/transcriptions (verbose_json，依音檔長度每 5 秒一個 segment)
+- Gemini: POST /v1beta/models/{model}:generateContent / :streamGenerateContent?alt=sse，
+  POST /v1beta/cachedContents (context cache 永遠建立成功)
+  帶音檔 (inlineData) 的請求視為逐字稿校正，純文字視為任務抽取
+- 延遲 = 固定延遲 + 每秒音訊的延遲 (Groq) + 隨機 jitter；依 failure rate 回 503
+- --groq-response / --gemini-transcript-response / --gemini-tasks-response 可改回放錄好的回應
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# 同 app.services.groq_client (這裡不 import app，獨立啟動時不需要 API key 設定)
+GROQ_TRANSCRIBE_PATH = "/openai/v1/audio/transcriptions"
+
+SEGMENT_SEC = 5.0
+SEGMENT_TEXT = "明天下午三點前要交數學作業，週末練習 C 語言指標"
+# 16k mono s16le (ai_service 轉檔後的格式)
+WAV_BYTES_PER_SEC = 32000
+WAV_HEADER_BYTES = 44
+STREAM_CHUNKS = 4
+
+
+def _load(path: str | None):
+    if path is None:
+        return None
+    with open(path) as f:
+        return f.read()
+
+
+def default_tasks_text() -> str:
+    now = datetime.now(timezone(timedelta(hours=8)))
+    tasks = [
+        {"title": "交數學作業", "type": "school", "difficulty": 4, "xp_value": 0,
+         "deadline": (now + timedelta(days=1)).replace(hour=15, minute=0, second=0, microsecond=0).isoformat()},
+        {"title": "練習 C 語言指標", "type": "skill", "difficulty": 6, "xp_value": 300,
+         "deadline": (now + timedelta(days=3)).replace(hour=20, minute=0, second=0, microsecond=0).isoformat()},
+        {"title": "整理書桌", "type": "misc", "difficulty": 1, "xp_value": 0, "deadline": None},
+    ]
+    return json.dumps({"tasks": tasks}, ensure_ascii=False)
+
+
+class StubBehaviour:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.groq_response = _load(args.groq_response)
+        self.transcript_response = _load(args.gemini_transcript_response)
+        self.tasks_response = _load(args.gemini_tasks_response)
+
+    async def delay(self, base: float, extra: float = 0.0) -> None:
+        jitter = self.rng.uniform(-self.args.jitter, self.args.jitter) * base
+        await asyncio.sleep(max(base + extra + jitter, 0.0))
+
+    def fails(self, rate: float) -> bool:
+        return self.rng.random() < rate
+
+    def groq_json(self, audio_sec: float) -> dict:
+        if self.groq_response is not None:
+            return json.loads(self.groq_response)
+        segments = []
+        start = 0.0
+        while start < audio_sec:
+            end = min(start + SEGMENT_SEC, audio_sec)
+            low = self.rng.random() < self.args.low_confidence_ratio
+            segments.append({
+                "id": len(segments),
+                "start": round(start, 2),
+                "end": round(end, 2),
+                "text": SEGMENT_TEXT,
+                "avg_logprob": -0.8 if low else -0.1,
+                "no_speech_prob": 0.01,
+            })
+            start = end
+        return {
+            "text": "".join(s["text"] for s in segments),
+            "language": "zh",
+            "duration": round(audio_sec, 2),
+            "segments": segments,
+        }
+
+
+def _audio_seconds(upload_bytes: int, filename: str) -> float:
+    if filename.endswith(".wav"):
+        return max(upload_bytes - WAV_HEADER_BYTES, 0) / WAV_BYTES_PER_SEC
+    # 其他格式無法從大小推算，抓一個保守值
+    return 10.0
+
+
+def _unavailable() -> JSONResponse:
+    return JSONResponse(
+        {"error": {"code": 503, "message": "stub server overloaded", "status": "UNAVAILABLE"}},
+        status_code=503
+    )
+
+
+def _gemini_body(text: str, model: str) -> dict:
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2},
+        "modelVersion": model,
+    }
+
+
+def build_app(behaviour: StubBehaviour) -> Starlette:
+    args = behaviour.args
+
+    async def transcribe(request: Request) -> Response:
+        form = await request.form()
+        upload = form["file"]
+        size = len(await upload.read())
+        audio_sec = _audio_seconds(size, upload.filename or "")
+        await behaviour.delay(args.groq_latency, args.groq_latency_per_sec * audio_sec)
+        if behaviour.fails(args.groq_failure_rate):
+            return _unavailable()
+        return JSONResponse(behaviour.groq_json(audio_sec))
+
+    async def gemini(request: Request) -> Response:
+        model, _, method = request.path_params["target"].partition(":")
+        payload = await request.json()
+        has_audio = any(
+            "inlineData" in part or "inline_data" in part
+            for content in payload.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        await behaviour.delay(args.gemini_latency)
+        if behaviour.fails(args.gemini_failure_rate):
+            return _unavailable()
+
+        if has_audio:
+            text = behaviour.transcript_response or json.dumps(
+                {"transcript": SEGMENT_TEXT}, ensure_ascii=False
+            )
+        else:
+            text = behaviour.tasks_response or default_tasks_text()
+
+        if method != "streamGenerateContent":
+            return JSONResponse(_gemini_body(text, model))
+
+        async def events():
+            step = max(len(text) // STREAM_CHUNKS, 1)
+            for i in range(0, len(text), step):
+                yield f"data: {json.dumps(_gemini_body(text[i:i + step], model), ensure_ascii=False)}\r\n\r\n"
+                await asyncio.sleep(args.gemini_chunk_interval)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def create_cache(request: Request) -> Response:
+        payload = await request.json()
+        ttl = float(str(payload.get("ttl", "3600s")).rstrip("s"))
+        expire = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        return JSONResponse({
+            "name": f"cachedContents/stub-{behaviour.rng.randrange(10**9)}",
+            "model": payload.get("model"),
+            "expireTime": expire.isoformat().replace("+00:00", "Z"),
+        })
+
+    return Starlette(routes=[
+        Route(GROQ_TRANSCRIBE_PATH, transcribe, methods=["POST"]),
+        Route("/{version}/cachedContents", create_cache, methods=["POST"]),
+        Route("/{version}/models/{target}", gemini, methods=["POST"]),
+    ])
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """benchmarks.speech 也用同一組參數啟動子行程"""
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="Seconds per Groq request")
+    parser.add_argument("--groq-latency-per-sec", type=float, default=0.005, help="Extra seconds per audio second")
+    parser.add_argument("--groq-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=1.0, help="Seconds per Gemini request")
+    parser.add_argument("--gemini-chunk-interval", type=float, default=0.1, help="Seconds between streamed chunks")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--low-confidence-ratio", type=float, default=0.2,
+                        help="Fraction of Groq segments below the correction threshold")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Relative latency jitter (0.1 = +-10%%)")
+    parser.add_argument("--groq-response", help="Recorded Groq verbose_json response to replay")
+    parser.add_argument("--gemini-transcript-response", help="Recorded Gemini correction output (model text)")
+    parser.add_argument("--gemini-tasks-response", help="Recorded Gemini task extraction output (model text)")
+    parser.add_argument("--stub-seed", dest="seed", type=int, default=7)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Groq and Gemini APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(build_app(StubBehaviour(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
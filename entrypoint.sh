@@ -20,4 +20,5 @@ fi
 
 # Start the application
 echo "Starting Uvicorn server..."
-exec uv run uvicorn app.main:app --host 0.0.0.0 --port 8000
+# SSE 串流 (/api/v1/events) 不會自己結束：關閉時最多等 10 秒，之後取消仍開著的連線再跑 lifespan shutdown
+exec uv run uvicorn app.main:app --host 0.0.0.0 --port 8000 --timeout-graceful-shutdown 10
@@ -0,0 +1,65 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# 設定必須在 import app 之前決定：獨立的 SQLite 檔、關閉語音快取 (測試自行注入)、不需要真的 API key
+_DB_DIR = tempfile.mkdtemp(prefix="entropy-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ["SPEECH_CACHE_ENABLED"] = "false"
+os.environ["LOG_LEVEL"] = "WARNING"
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import delete
+
+from app.core.database import WriteSessionLocal, async_engine, async_write_engine
+from app.main import app
+from app.models.speech_job import SpeechJob
+from app.models.task import Task
+from app.models.user import User
+from app.services.game_service import game_service
+from app.services.response_cache import response_cache
+from app.services.stress_service import stress_aggregate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_db():
+    """整個測試階段只跑一次 alembic upgrade head (與正式環境相同的 schema)"""
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+async def db_reset():
+    """
+    每個測試從空資料表 + 預設 User 開始，並清掉行程內的快取 / 聚合
+    結束時釋放連線池 (每個測試有自己的 event loop，連線不能跨 loop 重用)
+    """
+    async with WriteSessionLocal() as db:
+        for model in (SpeechJob, Task, User):
+            await db.execute(delete(model))
+        await game_service.ensure_user(db, user_id=1)
+        await db.commit()
+    stress_aggregate.invalidate()
+    response_cache.clear()
+    yield
+    await async_engine.dispose()
+    await async_write_engine.dispose()
+
+
+@pytest.fixture
+async def client(db_reset):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
@@ -0,0 +1,36 @@
+# tests/test_blackhole_scheduler.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.core.database import WriteSessionLocal
+from app.models.user import User
+from app.services.blackhole_scheduler import BlackholeScheduler
+from app.services.event_bus import event_bus
+from app.services.response_cache import data_version
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_sweep_publishes_dashboard_only_when_users_change(db_reset, monkeypatch):
+    published = []
+    monkeypatch.setattr(event_bus, "publish_dashboard", lambda: published.append(True))
+    async with WriteSessionLocal() as db:
+        one_day_ago = (datetime.now(timezone.utc) - timedelta(days=1)).replace(tzinfo=None)
+        await db.execute(update(User).values(blackhole_days=7.0, last_blackhole_update=one_day_ago))
+        await db.commit()
+
+    scheduler = BlackholeScheduler(interval_sec=0)
+    version = data_version.value
+    assert await scheduler.sweep_once() == 1
+    assert published == [True]
+    assert data_version.value > version
+
+    async with WriteSessionLocal() as db:
+        user = await db.get(User, 1)
+        assert user.blackhole_days == pytest.approx(6.0, abs=1e-3)
+
+    # 剛扣過的 User 會被略過：沒有變動就不推播
+    assert await scheduler.sweep_once() == 0
+    assert published == [True]
@@ -0,0 +1,70 @@
+# tests/test_commit_task.py
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import WriteSessionLocal
+from app.models.task import Task, TaskStatus, TaskType
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def _staged_task(task_type: TaskType, xp_value: int = 200) -> int:
+    async with WriteSessionLocal() as db:
+        task = Task(title="t", type=task_type, status=TaskStatus.STAGED, difficulty=3, xp_value=xp_value)
+        db.add(task)
+        await db.commit()
+        return task.id
+
+
+async def _user() -> User:
+    async with WriteSessionLocal() as db:
+        return await db.get(User, 1)
+
+
+async def test_concurrent_double_commit_rewards_once(client):
+    task_id = await _staged_task(TaskType.SKILL)
+    before = await _user()
+
+    responses = await asyncio.gather(*(client.post(f"/api/v1/tasks/{task_id}/commit") for _ in range(5)))
+
+    assert sorted(r.status_code for r in responses) == [200, 400, 400, 400, 400]
+    xp_gained = next(r.json()["xp_gained"] for r in responses if r.status_code == 200)
+    after = await _user()
+    assert after.current_xp == before.current_xp + xp_gained
+    assert after.blackhole_days == pytest.approx(before.blackhole_days + 3.0, abs=1e-2)
+
+
+async def test_commit_unknown_task_is_404(client):
+    response = await client.post("/api/v1/tasks/999999/commit")
+    assert response.status_code == 404
+
+
+async def test_level_only_changes_for_skill_tasks(client):
+    skill_id = await _staged_task(TaskType.SKILL)
+    misc_id = await _staged_task(TaskType.MISC)
+
+    response = await client.post(f"/api/v1/tasks/{skill_id}/commit")
+    xp = response.json()["xp_gained"]
+    user = await _user()
+    assert user.level == pytest.approx(1.0 + xp / 1000.0)
+
+    await client.post(f"/api/v1/tasks/{misc_id}/commit")
+    user = await _user()
+    assert user.current_xp == xp + 10
+    assert user.level == pytest.approx(1.0 + xp / 1000.0)
+
+
+async def test_first_commit_creates_missing_user(client):
+    async with WriteSessionLocal() as db:
+        await db.execute(delete(User))
+        await db.commit()
+    task_id = await _staged_task(TaskType.MISC)
+
+    response = await client.post(f"/api/v1/tasks/{task_id}/commit")
+    assert response.status_code == 200
+    user = await _user()
+    assert user.current_xp == 10
+    assert user.blackhole_days == pytest.approx(7.1, abs=1e-3)
@@ -0,0 +1,45 @@
+# tests/test_database.py
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+
+from app.core.database import AsyncSessionLocal, WriteSessionLocal, async_write_engine
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_sqlite_connections_use_wal(db_reset):
+    async with AsyncSessionLocal() as db:
+        assert (await db.scalar(text("PRAGMA journal_mode"))).lower() == "wal"
+
+
+async def test_write_sessions_begin_immediate(db_reset):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_write_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with WriteSessionLocal() as db:
+            await db.get(User, 1)
+            await db.commit()
+    finally:
+        event.remove(async_write_engine.sync_engine, "before_cursor_execute", record)
+    assert statements[0] == "BEGIN IMMEDIATE"
+
+
+async def test_concurrent_read_modify_write_is_serialized(db_reset):
+    """讀後寫的交易並行執行：不會 "database is locked"，也不會遺失更新"""
+    async def add_xp():
+        async with WriteSessionLocal() as db:
+            user = await db.get(User, 1)
+            await asyncio.sleep(0)
+            user.current_xp += 1
+            await db.commit()
+
+    await asyncio.gather(*(add_xp() for _ in range(10)))
+    async with AsyncSessionLocal() as db:
+        assert (await db.get(User, 1)).current_xp == 10
@@ -0,0 +1,56 @@
+# tests/test_json_stream.py
+import json
+
+import pytest
+
+from app.services.ai_service import AIService
+from app.utils.json_stream import JsonArrayItemStream
+
+DOCUMENT = json.dumps({
+    "tasks": [
+        {"title": "交報告 [期末]", "type": "school", "note": "含 \"引號\" 與 } 括號"},
+        "not a task",
+        42,
+        -1.5e3,
+        None,
+        True,
+        ["nested", {"title": "x"}],
+        {"title": "讀書", "type": "skill"},
+    ]
+}, ensure_ascii=False)
+
+
+def _parse(text: str, chunk_size: int) -> list:
+    stream = JsonArrayItemStream()
+    items = []
+    for start in range(0, len(text), chunk_size):
+        items += stream.feed(text[start:start + chunk_size])
+    stream.close()
+    return items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, len(DOCUMENT)])
+def test_stream_yields_every_array_item(chunk_size):
+    assert _parse(DOCUMENT, chunk_size) == json.loads(DOCUMENT)["tasks"]
+
+
+@pytest.mark.parametrize("text", ["[1, 2]", "[ 1 ,\n 2 ]", '{"tasks": [1,2]}'])
+def test_stream_splits_bare_literals(text):
+    assert _parse(text, 1) == [1, 2]
+
+
+def test_unclosed_array_raises():
+    stream = JsonArrayItemStream()
+    stream.feed('{"tasks": [{"title": "a"}')
+    with pytest.raises(ValueError):
+        stream.close()
+
+
+def test_streamed_and_parsed_items_validate_the_same():
+    """/speech/stream 與 /speech 對同一份輸出要得到相同的任務與失敗項目"""
+    streamed = AIService._validate_task_items(_parse(DOCUMENT, 3))
+    parsed = AIService._validate_task_items(json.loads(DOCUMENT)["tasks"])
+    assert streamed == parsed
+    tasks, failures = streamed
+    assert [task.title for task in tasks] == ["交報告 [期末]", "讀書"]
+    assert [item for item, _ in failures] == json.loads(DOCUMENT)["tasks"][1:7]
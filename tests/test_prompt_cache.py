@@ -0,0 +1,62 @@
+# tests/test_prompt_cache.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.prompt_cache import GeminiContextCache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCaches:
+    def __init__(self, fail_delete: bool = False):
+        self.created: list[str] = []
+        self.deleted: list[str] = []
+        self.fail_delete = fail_delete
+
+    async def create(self, model, config):
+        name = f"cachedContents/{len(self.created)}"
+        self.created.append(name)
+        return SimpleNamespace(name=name)
+
+    async def delete(self, name):
+        if self.fail_delete:
+            raise RuntimeError("boom")
+        self.deleted.append(name)
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_CONTEXT_CACHE_ENABLED", True)
+    return FakeCaches()
+
+
+def _client(caches: FakeCaches):
+    return SimpleNamespace(aio=SimpleNamespace(caches=caches))
+
+
+async def test_refresh_deletes_previous_cache(caches):
+    cache = GeminiContextCache()
+    client = _client(caches)
+    first = await cache.get(client, "m", "prompt")
+    assert await cache.get(client, "m", "prompt") == first
+
+    cache.invalidate("m", first)
+    second = await cache.get(client, "m", "prompt")
+    assert second != first
+    assert caches.deleted == [first]
+
+    # 舊 cache 的遲到錯誤不會讓新的 cache 失效
+    cache.invalidate("m", first)
+    assert await cache.get(client, "m", "prompt") == second
+    assert caches.created == [first, second]
+
+
+async def test_delete_failure_is_ignored(caches):
+    caches.fail_delete = True
+    cache = GeminiContextCache()
+    client = _client(caches)
+    first = await cache.get(client, "m", "prompt")
+    cache.invalidate("m")
+    assert await cache.get(client, "m", "prompt") not in (None, first)
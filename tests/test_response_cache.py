@@ -0,0 +1,58 @@
+# tests/test_response_cache.py
+import pytest
+
+from app.api.v1.endpoints import dashboard as dashboard_endpoint
+from app.core.config import settings
+from app.services.response_cache import etag_matches
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_unchanged_list_returns_304(client):
+    first = await client.get("/api/v1/tasks/")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    second = await client.get("/api/v1/tasks/", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+async def test_write_changes_etag(client):
+    etag = (await client.get("/api/v1/tasks/")).headers["ETag"]
+    await client.post("/api/v1/tasks/", json={"title": "new", "type": "school"})
+
+    response = await client.get("/api/v1/tasks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [task["title"] for task in response.json()] == ["new"]
+
+
+@pytest.mark.parametrize("staleness_sec, expected_renders", [(3600, 1), (0, 3)])
+async def test_dashboard_cache_respects_staleness_bound(client, monkeypatch, staleness_sec, expected_renders):
+    monkeypatch.setattr(settings, "DASHBOARD_MAX_STALENESS_SEC", staleness_sec)
+    calculate_state = dashboard_endpoint.game_service.calculate_state
+    renders = []
+
+    async def counted(db, user_id=1):
+        renders.append(user_id)
+        return await calculate_state(db, user_id=user_id)
+
+    monkeypatch.setattr(dashboard_endpoint.game_service, "calculate_state", counted)
+    for _ in range(3):
+        assert (await client.get("/api/v1/dashboard/")).status_code == 200
+    assert len(renders) == expected_renders
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ("*", True),
+    ('"other"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
@@ -0,0 +1,90 @@
+# tests/test_speech_cache.py
+import io
+import shutil
+import wave
+from collections import Counter
+
+import numpy as np
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.schemas.task import TaskCreate
+from app.services import ai_service as ai_module
+from app.services.ai_service import AIService
+from app.services.speech_cache import MemoryCacheBackend, SpeechCache
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed"),
+]
+
+RATE = 16000
+
+
+def _wav_with_silence() -> bytes:
+    """前後都有長靜音的 16k mono wav (VAD 一定會裁掉)"""
+    rng = np.random.default_rng(0)
+    t = np.arange(3 * RATE) / RATE
+    speech = np.sin(2 * np.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)) * 8000
+    silence = rng.normal(0, 30, 3 * RATE)
+    samples = np.concatenate([silence, speech, silence]).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def stubbed_pipeline(monkeypatch):
+    """外部呼叫換成計數的 stub，ffmpeg 與 VAD 照常執行但記錄次數"""
+    calls = Counter()
+    monkeypatch.setattr(ai_module, "speech_cache", SpeechCache(MemoryCacheBackend(max_entries=100, ttl_sec=3600)))
+    monkeypatch.setattr(settings, "VAD_ENABLED", True)
+    monkeypatch.setattr(settings, "TRANSCRIPT_CORRECTION_MODE", "always")
+
+    async def groq(audio, filename, mime_type):
+        calls["groq"] += 1
+        return {"text": "明天交報告", "segments": [{"start": 0.0, "end": 3.0, "text": "明天交報告", "avg_logprob": -0.1}]}
+
+    async def correct(**kwargs):
+        calls["correct"] += 1
+        return "明天交報告"
+
+    async def extract(**kwargs):
+        return [TaskCreate(title="交報告", type="school")]
+
+    transcode = AIService._transcode_audio
+
+    async def counted_transcode(*args, **kwargs):
+        calls["transcode"] += 1
+        return await transcode(*args, **kwargs)
+
+    trim_silence = ai_module.trim_silence
+
+    def counted_trim_silence(*args, **kwargs):
+        calls["vad"] += 1
+        return trim_silence(*args, **kwargs)
+
+    monkeypatch.setattr(AIService, "_groq_transcribe", staticmethod(groq))
+    monkeypatch.setattr(AIService, "_gemini_correct_transcript", staticmethod(correct))
+    monkeypatch.setattr(AIService, "_gemini_extract_tasks", staticmethod(extract))
+    monkeypatch.setattr(AIService, "_transcode_audio", staticmethod(counted_transcode))
+    monkeypatch.setattr(ai_module, "trim_silence", counted_trim_silence)
+    return calls
+
+
+async def test_repeated_trimmed_upload_hits_transcript_cache(stubbed_pipeline):
+    audio = _wav_with_silence()
+    for _ in range(2):
+        upload = UploadFile(io.BytesIO(audio), filename="a.wav", headers=Headers({"content-type": "audio/wav"}))
+        tasks, transcript, _ = await AIService.process_audio_instruction(upload)
+        assert transcript == "明天交報告"
+        assert [task.title for task in tasks] == ["交報告"]
+
+    # 第二次直接命中 transcript 快取：不再轉檔、VAD、轉錄或校正
+    assert stubbed_pipeline == {"transcode": 1, "vad": 1, "groq": 1, "correct": 1}
@@ -0,0 +1,84 @@
+# tests/test_speech_jobs.py
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import WriteSessionLocal
+from app.models.speech_job import SpeechJob, SpeechJobStatus
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+from app.services import speech_job_service, task_service
+from app.services.speech_job_service import SpeechJobManager
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def queued_job(db_reset, tmp_path, monkeypatch):
+    async def process_audio_spool(audio, mime_type, filename, timer=None):
+        return [TaskCreate(title="交報告", type="school"), TaskCreate(title="讀書", type="skill")], "transcript", {}
+
+    monkeypatch.setattr(speech_job_service.ai_service, "process_audio_spool", process_audio_spool)
+    audio_path = tmp_path / "job.webm"
+    audio_path.write_bytes(b"audio")
+    async with WriteSessionLocal() as db:
+        db.add(SpeechJob(
+            id="job1",
+            status=SpeechJobStatus.QUEUED,
+            audio_path=str(audio_path),
+            audio_sha256="0" * 64,
+            filename="job.webm",
+            mime_type="audio/webm"
+        ))
+        await db.commit()
+    return "job1"
+
+
+async def _task_count() -> int:
+    async with WriteSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Task))
+
+
+async def test_crash_before_commit_does_not_duplicate_tasks_on_recovery(queued_job, monkeypatch):
+    insert_tasks_bulk = task_service.insert_tasks_bulk
+
+    async def insert_then_crash(db, tasks_in):
+        await insert_tasks_bulk(db, tasks_in)
+        raise asyncio.CancelledError  # 行程在任務寫入後、job 標記完成前被終止
+
+    monkeypatch.setattr(task_service, "insert_tasks_bulk", insert_then_crash)
+    with pytest.raises(asyncio.CancelledError):
+        await SpeechJobManager(workers=1, max_pending=10)._run(queued_job)
+    assert await _task_count() == 0
+
+    # 重啟：job 重新排入並重跑，任務只建立一次
+    monkeypatch.setattr(task_service, "insert_tasks_bulk", insert_tasks_bulk)
+    manager = SpeechJobManager(workers=1, max_pending=10)
+    await manager._recover()
+    await manager._run(queued_job)
+
+    assert await _task_count() == 2
+    async with WriteSessionLocal() as db:
+        job = await db.get(SpeechJob, queued_job)
+        assert job.status == SpeechJobStatus.SUCCEEDED
+        assert len(job.task_ids) == 2
+        assert job.audio_path is None
+        assert "save" in job.timings
+
+
+async def test_save_failure_marks_job_failed(queued_job, monkeypatch, tmp_path):
+    async def broken_insert(db, tasks_in):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(task_service, "insert_tasks_bulk", broken_insert)
+    await SpeechJobManager(workers=1, max_pending=10)._run(queued_job)
+
+    assert await _task_count() == 0
+    async with WriteSessionLocal() as db:
+        job = await db.get(SpeechJob, queued_job)
+        assert job.status == SpeechJobStatus.FAILED
+        assert job.error_status == 500
+        assert job.audio_path is None
+    assert not os.path.exists(tmp_path / "job.webm")
@@ -0,0 +1,60 @@
+# tests/test_stress_aggregate.py
+import math
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.task import TaskStatus, TaskType
+from app.services.stress_service import StressAggregate
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(task_id: int, difficulty: int = 5, days: float | None = 2.0):
+    deadline = None if days is None else NOW + timedelta(days=days)
+    return SimpleNamespace(id=task_id, title=f"t{task_id}", difficulty=difficulty, deadline=deadline)
+
+
+def _task(task_id: int, status: TaskStatus = TaskStatus.STAGED, task_type: TaskType = TaskType.SCHOOL):
+    return SimpleNamespace(**vars(_row(task_id)), type=task_type, status=status)
+
+
+def test_load_is_discarded_when_a_write_happens_during_the_query():
+    aggregate = StressAggregate()
+    generation = aggregate.begin_load()
+    aggregate.upsert(_task(1))  # 查詢期間有任務寫入
+
+    assert aggregate.load([_row(2)], generation) is False
+    assert not aggregate.loaded
+
+    assert aggregate.load([_row(1)], aggregate.begin_load()) is True
+    assert aggregate.loaded
+
+
+def test_upsert_and_discard_keep_only_active_school_tasks():
+    aggregate = StressAggregate()
+    aggregate.load([_row(1), _row(2)], aggregate.begin_load())
+
+    aggregate.upsert(_task(3))
+    aggregate.upsert(_task(1, status=TaskStatus.COMPLETED))
+    aggregate.upsert(_task(4, task_type=TaskType.SKILL))
+    aggregate.discard(2)
+
+    assert aggregate.columns().ids.tolist() == [3]
+
+
+def test_compute_matches_the_scalar_formula():
+    aggregate = StressAggregate()
+    aggregate.load([_row(1, 5, 2.0), _row(2, 8, None), _row(3, 10, -1.0)], aggregate.begin_load())
+
+    total, breakdown = aggregate.compute(NOW)
+
+    expected = [
+        min(5 / max(math.log(2.0 + 1), 0.1), 40.0),
+        min(8 / max(math.log(7.0 + 1), 0.1), 40.0),
+        min(10 / max(math.log(0.001 + 1), 0.1), 40.0),
+    ]
+    assert total == pytest.approx(sum(expected))
+    assert [item["days_left"] for item in breakdown] == [2.0, 7.0, 0.0]
+    assert aggregate.total_stress(NOW) == pytest.approx(total)
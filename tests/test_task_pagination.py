@@ -0,0 +1,38 @@
+# tests/test_task_pagination.py
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create_tasks(client, count: int) -> list[int]:
+    response = await client.post("/api/v1/tasks/bulk", json={
+        "tasks": [{"title": f"t{i}", "type": "school"} for i in range(count)]
+    })
+    assert response.status_code == 201
+    return [task["id"] for task in response.json()]
+
+
+async def test_cursor_pages_cover_every_task_once(client):
+    ids = await _create_tasks(client, 5)
+    seen, cursor = [], None
+    while True:
+        params = {"status": "draft", "type": "school", "limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/tasks/", params=params)
+        assert response.status_code == 200
+        seen += [task["id"] for task in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == ids
+
+
+async def test_cursor_with_skip_is_rejected(client):
+    response = await client.get("/api/v1/tasks/", params={"cursor": 1, "skip": 10})
+    assert response.status_code == 400
+
+
+async def test_page_size_is_capped(client):
+    response = await client.get("/api/v1/tasks/", params={"limit": 100000})
+    assert response.status_code == 422